@@ -1,10 +1,16 @@
+import numpy as np
 import pygame
-from queue import PriorityQueue
+
+from busqueda import ObservadorLimitado, buscar
+from componentes import Componentes
+from dstar_lite import ReplanificadorDStarLite
+from grid import Grid
 
 # Configuraciones iniciales
 ANCHO_VENTANA = 800
-VENTANA = pygame.display.set_mode((ANCHO_VENTANA, ANCHO_VENTANA))
-pygame.display.set_caption("Visualización de Nodos")
+FPS_BUSQUEDA = 30  # Cuadros por segundo al visualizar la búsqueda
+FPS_INTERFAZ = 60  # Límite de cuadros por segundo del bucle principal
+COLOR_TRANSPARENTE = (255, 0, 255)  # Color clave de la capa de líneas
 
 # Colores (RGB)
 BLANCO = (255, 255, 255)
@@ -15,44 +21,75 @@ ROJO = (255, 0, 0)
 NARANJA = (255, 165, 0)
 PURPURA = (128, 0, 128)
 
+# Códigos de color guardados por celda en el arreglo `colores` del tablero
+PALETA = [BLANCO, NEGRO, GRIS, VERDE, ROJO, NARANJA, PURPURA]
+CODIGO_COLOR = {color: codigo for codigo, color in enumerate(PALETA)}
+
+
+class Tablero:
+    """Grid de búsqueda junto con el color de cada celda para la interfaz"""
+
+    def __init__(self, filas, ancho):
+        self.grid = Grid(filas)
+        Componentes(self.grid)  # Rechaza al instante los objetivos encerrados
+        self.filas = filas
+        self.ancho_nodo = ancho // filas
+        self.colores = np.zeros((filas, filas), dtype=np.uint8)
+        self.sucias = set()  # Celdas cuyo color cambió desde el último cuadro
+
+    def nodo(self, fila, col):
+        return Nodo(self, fila, col)
+
+    def pintar(self, fila, col, color):
+        codigo = CODIGO_COLOR[color]
+        if self.colores[fila, col] != codigo:
+            self.colores[fila, col] = codigo
+            self.sucias.add((fila, col))
+
+
 class Nodo:
-    def __init__(self, fila, col, ancho, total_filas):
+    """Vista ligera de una celda del tablero; el estado vive en los arreglos"""
+
+    __slots__ = ("tablero", "fila", "col")
+
+    def __init__(self, tablero, fila, col):
+        self.tablero = tablero
         self.fila = fila
         self.col = col
-        self.x = fila * ancho
-        self.y = col * ancho
-        self.color = BLANCO
-        self.ancho = ancho
-        self.total_filas = total_filas
-        self.vecinos = []
-        self.g = float("inf")  # Coste desde el inicio
-        self.f = float("inf")  # g + h
-        self.h = 0  # Heurística
-
-    def __lt__(self, otro):
-        return self.f < otro.f  # Compara nodos usando f-score
-
-    def actualizar_vecinos(self, grid):
-        """Determina los vecinos accesibles (no paredes), incluyendo diagonales"""
-        self.vecinos = []
-        direcciones = [
-            (-1, 0), (1, 0), (0, -1), (0, 1),       # Arriba, Abajo, Izquierda, Derecha
-            (-1, -1), (-1, 1), (1, -1), (1, 1)      # Diagonales
-        ]
-        for dx, dy in direcciones:
-            nueva_fila = self.fila + dx
-            nueva_col = self.col + dy
-            if 0 <= nueva_fila < self.total_filas and 0 <= nueva_col < self.total_filas:
-                vecino = grid[nueva_fila][nueva_col]
-                if not vecino.es_pared():
-                    self.vecinos.append(vecino)
 
+    def __eq__(self, otro):
+        if not isinstance(otro, Nodo):
+            return NotImplemented
+        return self.tablero is otro.tablero and self.get_pos() == otro.get_pos()
+
+    def __hash__(self):
+        return hash(self.get_pos())
+
+    @property
+    def x(self):
+        return self.fila * self.tablero.ancho_nodo
+
+    @property
+    def y(self):
+        return self.col * self.tablero.ancho_nodo
+
+    @property
+    def ancho(self):
+        return self.tablero.ancho_nodo
+
+    @property
+    def color(self):
+        return PALETA[self.tablero.colores[self.fila, self.col]]
+
+    @color.setter
+    def color(self, color):
+        self.tablero.pintar(self.fila, self.col, color)
 
     def get_pos(self):
         return self.fila, self.col
 
     def es_pared(self):
-        return self.color == NEGRO
+        return self.tablero.grid.es_pared(self.get_pos())
 
     def es_inicio(self):
         return self.color == NARANJA
@@ -61,106 +98,113 @@ class Nodo:
         return self.color == PURPURA
 
     def restablecer(self):
+        self.tablero.grid.restablecer(self.get_pos())
         self.color = BLANCO
 
     def hacer_inicio(self):
+        self.tablero.grid.restablecer(self.get_pos())
         self.color = NARANJA
 
     def hacer_pared(self):
+        self.tablero.grid.hacer_pared(self.get_pos())
         self.color = NEGRO
 
     def hacer_fin(self):
+        self.tablero.grid.restablecer(self.get_pos())
         self.color = PURPURA
 
     def dibujar(self, ventana):
         pygame.draw.rect(ventana, self.color, (self.x, self.y, self.ancho, self.ancho))
 
-    
 
-def heuristica(p1, p2):
-    x1, y1 = p1
-    x2, y2 = p2
-    return abs(x1 - x2) + abs(y1 - y2)
+class ObservadorPygame(ObservadorLimitado):
+    """Colorea las celdas durante la búsqueda y redibuja a un ritmo limitado"""
 
-def a_star(dibujar, grid, inicio, objetivo):
-    open_set = PriorityQueue()
-    open_set.put((0, inicio))
-    came_from = {}
-    g_score = {nodo: float("inf") for fila in grid for nodo in fila}
-    f_score = {nodo: float("inf") for fila in grid for nodo in fila}
+    def __init__(self, tablero, dibujar, fps=30):
+        super().__init__(dibujar, fps)
+        self.tablero = tablero
 
-    g_score[inicio] = 0
-    f_score[inicio] = heuristica(inicio.get_pos(), objetivo.get_pos())
+    def marcar(self, pos, color):
+        nodo = self.tablero.nodo(*pos)
+        if not nodo.es_inicio() and not nodo.es_fin():
+            nodo.color = color
 
-    open_set_hash = {inicio}
+    def nodo_abierto(self, pos):
+        self.marcar(pos, GRIS)  # Marca el vecino como visitado
 
-    while not open_set.empty():
-        current = open_set.get()[1]
-        open_set_hash.remove(current)
+    def nodo_cerrado(self, pos):
+        self.marcar(pos, ROJO)  # Marca el nodo como procesado
+        self.refrescar()
 
-        if current == objetivo:
-            reconstruir_camino(came_from, current, dibujar)
-            return True
+    def terminado(self, resultado):
+        for pos in resultado.camino:
+            self.marcar(pos, VERDE)  # Marca el camino óptimo
+        self.dibujar()
 
-        for vecino in current.vecinos:
-            # Detectar si es un movimiento diagonal
-            dx = abs(current.fila - vecino.fila)
-            dy = abs(current.col - vecino.col)
-            costo = 1.4 if dx == 1 and dy == 1 else 1  # Diagonal = 1.4, Ortogonal = 1.0
-
-            tentative_g_score = g_score[current] + costo
-
-            if tentative_g_score < g_score[vecino]:
-                came_from[vecino] = current
-                g_score[vecino] = tentative_g_score
-                f_score[vecino] = g_score[vecino] + heuristica(vecino.get_pos(), objetivo.get_pos())
-
-                if vecino not in open_set_hash:
-                    open_set.put((f_score[vecino], vecino))
-                    open_set_hash.add(vecino)
-                    if not vecino.es_inicio() and not vecino.es_fin():
-                        vecino.color = GRIS  # Marca el vecino como visitado
-
-        dibujar()
-
-        if current != inicio and current != objetivo:
-            current.color = ROJO  # Marca el nodo como procesado
-
-    return False
-
-
-def reconstruir_camino(came_from, current, dibujar):
-    while current in came_from:
-        current = came_from[current]
-        if not current.es_inicio() and not current.es_fin():
-            current.color = VERDE  # Marca el camino óptimo
-        dibujar()
 
 def crear_grid(filas, ancho):
-    grid = []
-    ancho_nodo = ancho // filas
-    for i in range(filas):
-        grid.append([])
-        for j in range(filas):
-            nodo = Nodo(i, j, ancho_nodo, filas)
-            grid[i].append(nodo)
-    return grid
+    return Tablero(filas, ancho)
 
 def dibujar_grid(ventana, filas, ancho):
     ancho_nodo = ancho // filas
     for i in range(filas):
         pygame.draw.line(ventana, GRIS, (0, i * ancho_nodo), (ancho, i * ancho_nodo))
-        for j in range(filas):
-            pygame.draw.line(ventana, GRIS, (j * ancho_nodo, 0), (j * ancho_nodo, ancho))
+        pygame.draw.line(ventana, GRIS, (i * ancho_nodo, 0), (i * ancho_nodo, ancho))
+
+
+class Renderizador:
+    """Dibuja solo las celdas que cambiaron de color desde el cuadro anterior.
+
+    Las líneas de la cuadrícula se dibujan una sola vez en una capa aparte y
+    se vuelven a pegar solo sobre los rectángulos sucios; la pantalla se
+    actualiza únicamente en esos rectángulos.
+    """
 
-def dibujar(ventana, grid, filas, ancho):
-    ventana.fill(BLANCO)
-    for fila in grid:
-        for nodo in fila:
-            nodo.dibujar(ventana)
+    # Con más celdas sucias que esta fracción del tablero conviene un cuadro completo
+    FRACCION_COMPLETO = 0.25
+
+    def __init__(self, ventana, tablero, ancho):
+        self.ventana = ventana
+        self.tablero = tablero
+        self.ancho = ancho
+        self.rejilla = pygame.Surface((ancho, ancho))
+        self.rejilla.fill(COLOR_TRANSPARENTE)
+        self.rejilla.set_colorkey(COLOR_TRANSPARENTE)
+        dibujar_grid(self.rejilla, tablero.filas, ancho)
+        self.dibujar_todo()
+
+    def _rect(self, fila, col):
+        ancho_nodo = self.tablero.ancho_nodo
+        return pygame.Rect(fila * ancho_nodo, col * ancho_nodo, ancho_nodo, ancho_nodo)
+
+    def dibujar_todo(self):
+        tablero = self.tablero
+        self.ventana.fill(BLANCO)
+        for fila in range(tablero.filas):
+            for col in range(tablero.filas):
+                codigo = tablero.colores[fila, col]
+                if codigo:
+                    pygame.draw.rect(self.ventana, PALETA[codigo], self._rect(fila, col))
+        self.ventana.blit(self.rejilla, (0, 0))
+        tablero.sucias.clear()
+        pygame.display.update()
+
+    def dibujar(self):
+        tablero = self.tablero
+        if not tablero.sucias:
+            return  # Nada cambió: no se toca la pantalla
+        if len(tablero.sucias) > self.FRACCION_COMPLETO * tablero.filas ** 2:
+            self.dibujar_todo()
+            return
+        rects = []
+        for fila, col in tablero.sucias:
+            rect = self._rect(fila, col)
+            pygame.draw.rect(self.ventana, PALETA[tablero.colores[fila, col]], rect)
+            self.ventana.blit(self.rejilla, rect, area=rect)
+            rects.append(rect)
+        tablero.sucias.clear()
+        pygame.display.update(rects)
 
-    dibujar_grid(ventana, filas, ancho)
-    pygame.display.update()
 
 def obtener_click_pos(pos, filas, ancho):
     ancho_nodo = ancho // filas
@@ -171,33 +215,56 @@ def obtener_click_pos(pos, filas, ancho):
 
 def main(ventana, ancho):
     FILAS = 11
-    grid = crear_grid(FILAS, ancho)
+    tablero = crear_grid(FILAS, ancho)
 
     inicio = None
     fin = None
+    replanificador = None
+    extremos_replanificador = None
+    renderizador = Renderizador(ventana, tablero, ancho)
+    reloj = pygame.time.Clock()
 
     corriendo = True
 
     while corriendo:
-        dibujar(ventana, grid, FILAS, ancho)
+        renderizador.dibujar()
+        reloj.tick(FPS_INTERFAZ)
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 corriendo = False
 
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE and inicio and fin:
-                # Actualizar vecinos antes de ejecutar A*
-                    for fila in grid:
-                        for nodo in fila:
-                            nodo.actualizar_vecinos(grid)
-
-                    a_star(lambda: dibujar(VENTANA, grid, FILAS, ANCHO_VENTANA), grid, inicio, fin)
+            if event.type == pygame.VIDEOEXPOSE:
+                renderizador.dibujar_todo()  # La ventana se destapó: se repinta completa
+
+            if event.type == pygame.KEYDOWN and inicio and fin:
+                def refrescar():
+                    pygame.event.pump()  # Mantiene la ventana respondiendo
+                    renderizador.dibujar()
+
+                observador = ObservadorPygame(tablero, refrescar, fps=FPS_BUSQUEDA)
+
+                # ESPACIO ejecuta A*, J Jump Point Search, W Weighted A*, A ARA*,
+                # B A* bidireccional y D replanifica con D* Lite
+                modo = {pygame.K_SPACE: "a_star", pygame.K_j: "jps", pygame.K_w: "ponderado",
+                        pygame.K_a: "ara", pygame.K_b: "bidireccional"}.get(event.key)
+                if modo:
+                    buscar(tablero.grid, inicio.get_pos(), fin.get_pos(), modo=modo,
+                           observador=observador)
+                elif event.key == pygame.K_d:
+                    # El replanificador se conserva entre ediciones de paredes
+                    extremos = (inicio.get_pos(), fin.get_pos())
+                    if replanificador is None or extremos != extremos_replanificador:
+                        if replanificador is not None:
+                            replanificador.cerrar()
+                        replanificador = ReplanificadorDStarLite(tablero.grid, *extremos)
+                        extremos_replanificador = extremos
+                    replanificador.buscar(observador)
 
 
             if pygame.mouse.get_pressed()[0]:  # Click izquierdo
                 pos = pygame.mouse.get_pos()
                 fila, col = obtener_click_pos(pos, FILAS, ancho)
-                nodo = grid[fila][col]
+                nodo = tablero.nodo(fila, col)
                 if not inicio and nodo != fin:
                     inicio = nodo
                     inicio.hacer_inicio()
@@ -212,7 +279,7 @@ def main(ventana, ancho):
             elif pygame.mouse.get_pressed()[2]:  # Click derecho
                 pos = pygame.mouse.get_pos()
                 fila, col = obtener_click_pos(pos, FILAS, ancho)
-                nodo = grid[fila][col]
+                nodo = tablero.nodo(fila, col)
                 nodo.restablecer()
                 if nodo == inicio:
                     inicio = None
@@ -221,4 +288,8 @@ def main(ventana, ancho):
 
     pygame.quit()
 
-main(VENTANA, ANCHO_VENTANA)
\ No newline at end of file
+
+if __name__ == "__main__":
+    VENTANA = pygame.display.set_mode((ANCHO_VENTANA, ANCHO_VENTANA))
+    pygame.display.set_caption("Visualización de Nodos")
+    main(VENTANA, ANCHO_VENTANA)
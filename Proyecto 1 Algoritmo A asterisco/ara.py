@@ -0,0 +1,124 @@
+"""ARA* (Anytime Repairing A*) sobre el mismo `Grid` que usa A*.
+
+Empieza como Weighted A* con un peso alto, que encuentra rápido un primer
+camino con costo a lo sumo `peso` veces el óptimo. Después baja el peso y
+repara la búsqueda reutilizando los valores g ya calculados: solo vuelven a
+la cola los nodos abiertos y los que mejoraron después de cerrarse. Cada
+iteración da un camino igual o mejor con una cota más ajustada, así que se
+puede cortar en cualquier momento con `limite` segundos.
+"""
+import time
+
+from busqueda import (TOLERANCIA, ConjuntoAbierto, Resultado, costo_camino, reconstruir_camino,
+                      rechazo_inmediato)
+from heuristicas import obtener_heuristica
+
+PESO_INICIAL = 3.0
+PASO_PESO = 0.5
+# Cada cuántas expansiones se revisa si se agotó el tiempo
+REVISAR_TIEMPO = 256
+
+
+def ara_star(grid, inicio, objetivo, observador=None, heuristica="octil",
+             peso_inicial=PESO_INICIAL, paso=PASO_PESO, limite=None):
+    """Busca con ARA* y devuelve el mejor camino encontrado.
+
+    El primer camino siempre se completa; con `limite` (segundos) las
+    iteraciones siguientes se cortan al agotarse el tiempo. `cota` del
+    `Resultado` garantiza costo <= cota * óptimo y `soluciones` lista
+    (segundos, costo, cota) de cada camino encontrado.
+    """
+    t0 = time.perf_counter()
+    heuristica = obtener_heuristica(heuristica)
+    if peso_inicial < 1 or paso <= 0:
+        raise ValueError(f"Se requiere peso_inicial >= 1 y paso > 0: {peso_inicial}, {paso}")
+    rechazo = rechazo_inmediato(grid, inicio, objetivo, observador, t0)
+    if rechazo is not None:
+        rechazo.soluciones = []
+        return rechazo
+    g_score = memoryview(grid.g)
+    came_from = memoryview(grid.padre)
+
+    nodo_inicio = grid.indice(inicio)
+    nodo_objetivo = grid.indice(objetivo)
+    h_calculada = {}
+
+    def h(nodo):
+        valor = h_calculada.get(nodo)
+        if valor is None:
+            valor = h_calculada[nodo] = heuristica(grid.posicion(nodo), objetivo)
+        return valor
+
+    g_score[nodo_inicio] = 0
+    tocados = [nodo_inicio]
+    abiertos = {nodo_inicio}   # Nodos en la cola de la iteración actual
+    inconsistentes = set()     # Nodos que mejoraron después de cerrarse
+    peso = peso_inicial
+    camino, costo, cota = [], float("inf"), None
+    soluciones = []
+    expandidos = inserciones = 0
+
+    try:
+        while True:
+            open_set = ConjuntoAbierto()
+            for nodo in abiertos:
+                open_set.agregar(nodo, g_score[nodo], peso * h(nodo))
+            cerrados = set()
+            agotado = False
+
+            while open_set.minimo(g_score) < g_score[nodo_objetivo] - TOLERANCIA:
+                if (limite is not None and camino and expandidos % REVISAR_TIEMPO == 0
+                        and time.perf_counter() - t0 > limite):
+                    agotado = True
+                    break
+                current, g_current = open_set.extraer(g_score)
+                abiertos.discard(current)
+                cerrados.add(current)
+                expandidos += 1
+
+                for vecino, costo_paso in grid.vecinos(current):
+                    tentative_g_score = g_current + costo_paso
+                    if tentative_g_score < g_score[vecino] - TOLERANCIA:
+                        if came_from[vecino] < 0 and vecino != nodo_inicio:
+                            tocados.append(vecino)
+                        came_from[vecino] = current
+                        g_score[vecino] = tentative_g_score
+                        if vecino in cerrados:
+                            inconsistentes.add(vecino)
+                        else:
+                            open_set.agregar(vecino, g_score[vecino], peso * h(vecino))
+                            abiertos.add(vecino)
+                            if observador is not None:
+                                observador.nodo_abierto(grid.posicion(vecino))
+
+                if observador is not None:
+                    observador.nodo_cerrado(grid.posicion(current))
+            inserciones += open_set.inserciones
+
+            g_objetivo = g_score[nodo_objetivo]
+            if agotado or g_objetivo == float("inf"):
+                break  # Sin tiempo (se conserva el camino anterior) o sin camino
+
+            camino = reconstruir_camino(grid, nodo_objetivo)
+            costo = costo_camino(camino, grid)
+            pendientes = abiertos | inconsistentes
+            if pendientes:
+                minimo_f = min(g_score[nodo] + h(nodo) for nodo in pendientes)
+                cota = min(peso, max(1.0, g_objetivo / minimo_f)) if minimo_f > 0 else peso
+            else:
+                cota = 1.0  # No queda nada por explorar: el camino es óptimo
+            soluciones.append((time.perf_counter() - t0, costo, cota))
+
+            if cota <= 1 or (limite is not None and time.perf_counter() - t0 > limite):
+                break
+            peso = max(1.0, peso - paso)
+            abiertos |= inconsistentes
+            inconsistentes = set()
+    finally:
+        grid.limpiar(tocados)
+
+    resultado = Resultado(camino, costo, expandidos, inserciones, time.perf_counter() - t0, cota=cota)
+    resultado.soluciones = soluciones
+    if observador is not None:
+        observador.terminado(resultado)
+    return resultado
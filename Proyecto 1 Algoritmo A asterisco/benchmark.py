@@ -0,0 +1,141 @@
+"""Mide los motores de búsqueda sobre mapas y escenarios reproducibles.
+
+Sin argumentos usa mapas generados (obstáculos, laberinto y habitaciones)
+con una semilla fija; también acepta pares de archivos MovingAI:
+
+    python benchmark.py
+    python benchmark.py mapa.map mapa.map.scen --modos a_star jps hpa
+
+Para cada mapa y modo informa nodos expandidos, inserciones en el heap,
+microsegundos por consulta y memoria por consulta (pico de tracemalloc,
+medido en una segunda pasada para no alterar los tiempos).
+"""
+import argparse
+import os
+import time
+import tracemalloc
+
+from busqueda import MODOS, buscar
+from grid import Grid
+from hpa import MapaJerarquico
+from mapas import GENERADORES, cargar_escenarios, cargar_mapa, generar_escenarios
+
+MODOS_BENCHMARK = MODOS + ("hpa",)
+
+
+class Medicion:
+    """Promedios de un modo sobre todas las consultas de un mapa"""
+
+    def __init__(self, modo, consultas, encontrados, expandidos, inserciones, segundos,
+                 memoria, costo_total, preparacion=0.0):
+        self.modo = modo
+        self.consultas = consultas
+        self.encontrados = encontrados
+        self.expandidos = expandidos      # Nodos expandidos por consulta
+        self.inserciones = inserciones    # Inserciones en el heap por consulta
+        self.segundos = segundos          # Tiempo medio por consulta
+        self.memoria = memoria            # Bytes de pico por consulta (None si no se midió)
+        self.costo_total = costo_total    # Suma de costos, para comparar la calidad entre modos
+        self.preparacion = preparacion    # Segundos de precálculo (solo hpa)
+
+
+def _resolvedor(grid, modo):
+    """Devuelve (función(inicio, objetivo) -> Resultado, segundos de preparación)"""
+    if modo == "hpa":
+        t0 = time.perf_counter()
+        mapa = MapaJerarquico(grid)
+        mapa.actualizar()
+        return mapa.buscar, time.perf_counter() - t0
+    return (lambda inicio, objetivo: buscar(grid, inicio, objetivo, modo=modo)), 0.0
+
+
+def medir(grid, escenarios, modo, memoria=True):
+    """Resuelve todos los escenarios con un modo y devuelve una `Medicion`"""
+    resolver, preparacion = _resolvedor(grid, modo)
+    resultados = []
+    t0 = time.perf_counter()
+    for esc in escenarios:
+        resultados.append(resolver(esc.inicio, esc.objetivo))
+    total = time.perf_counter() - t0
+
+    pico = None
+    if memoria:
+        picos = []
+        tracemalloc.start()
+        for esc in escenarios:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            resolver(esc.inicio, esc.objetivo)
+            picos.append(tracemalloc.get_traced_memory()[1] - base)
+        tracemalloc.stop()
+        pico = sum(picos) / len(picos)
+
+    n = len(escenarios)
+    encontrados = [r for r in resultados if r.encontrado]
+    return Medicion(modo, n, len(encontrados),
+                    sum(r.expandidos for r in resultados) / n,
+                    sum(r.abiertos for r in resultados) / n,
+                    total / n, pico, sum(r.costo for r in encontrados), preparacion)
+
+
+def casos_generados(tamano, consultas, semilla):
+    """[(nombre, ocupación, escenarios)] con un mapa de cada generador"""
+    casos = []
+    for nombre, generador in GENERADORES.items():
+        ocupacion = generador(tamano, semilla=semilla)
+        casos.append((f"{nombre} {tamano}x{tamano}", ocupacion,
+                      generar_escenarios(ocupacion, consultas, semilla=semilla)))
+    return casos
+
+
+def casos_movingai(rutas, consultas):
+    """[(nombre, ocupación, escenarios)] a partir de pares de rutas .map y .scen"""
+    if len(rutas) % 2:
+        raise ValueError("Se esperan pares de archivos: mapa.map escenarios.scen")
+    casos = []
+    for ruta_mapa, ruta_escenarios in zip(rutas[::2], rutas[1::2]):
+        escenarios = cargar_escenarios(ruta_escenarios)
+        if consultas:
+            escenarios = escenarios[:consultas]
+        casos.append((os.path.basename(ruta_mapa), cargar_mapa(ruta_mapa), escenarios))
+    return casos
+
+
+def imprimir(nombre, mediciones):
+    print(f"\n{nombre}")
+    print(f"{'modo':<14} {'consultas':>9} {'exp./cons.':>11} {'heap/cons.':>11} "
+          f"{'µs/cons.':>10} {'KiB/cons.':>10} {'costo total':>12}")
+    for m in mediciones:
+        memoria = f"{m.memoria / 1024:>10.1f}" if m.memoria is not None else f"{'-':>10}"
+        extra = f"  (preparación {m.preparacion:.2f} s)" if m.preparacion else ""
+        print(f"{m.modo:<14} {m.encontrados:>4}/{m.consultas:<4} {m.expandidos:>11.1f} "
+              f"{m.inserciones:>11.1f} {m.segundos * 1e6:>10.0f} {memoria} "
+              f"{m.costo_total:>12.1f}{extra}")
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Benchmark de los motores de búsqueda")
+    parser.add_argument("archivos", nargs="*", help="pares mapa.map escenarios.scen de MovingAI")
+    parser.add_argument("--modos", nargs="+", default=["a_star", "jps", "bidireccional"],
+                        choices=MODOS_BENCHMARK)
+    parser.add_argument("--consultas", type=int, default=50,
+                        help="consultas por mapa (en archivos .scen, 0 usa todas)")
+    parser.add_argument("--tamano", type=int, default=128, help="lado de los mapas generados")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--sin-memoria", action="store_true", help="omite la pasada de tracemalloc")
+    args = parser.parse_args(argumentos)
+
+    if args.archivos:
+        casos = casos_movingai(args.archivos, args.consultas)
+    else:
+        casos = casos_generados(args.tamano, args.consultas, args.semilla)
+    for nombre, ocupacion, escenarios in casos:
+        if not escenarios:
+            continue
+        grid = Grid.desde_arreglo(ocupacion)
+        imprimir(nombre, [medir(grid, escenarios, modo, not args.sin_memoria)
+                          for modo in args.modos])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""A* bidireccional sobre el mismo `Grid` que usa A*.
+
+Se avanza a la vez desde el inicio y desde el objetivo, expandiendo cada vez
+el lado con menos nodos abiertos. Cuando un lado alcanza una celda que el
+otro ya tiene, se guarda el mejor costo conocido μ de un camino completo.
+
+Las dos búsquedas usan potenciales promedio: p(v) = (h(v, objetivo) -
+h(inicio, v)) / 2 hacia adelante y -p(v) hacia atrás. Con una heurística
+consistente (la octil lo es con diagonales de 1.4) ambos potenciales también
+lo son, y la suma de las claves mínimas de las dos colas es una cota inferior
+del costo de cualquier camino todavía no visto. Por eso la búsqueda termina
+cuando esa suma llega a μ; detenerse en el primer encuentro no basta, porque
+ese camino puede no ser el óptimo.
+
+Ejecutado como script compara expansiones y tiempo con `a_star` en
+laberintos generados.
+"""
+import time
+
+from busqueda import TOLERANCIA, ConjuntoAbierto, Resultado, a_star, costo_camino, rechazo_inmediato
+from grid import Grid, LIBRE
+from heuristicas import obtener_heuristica
+from mapas import generar_laberinto
+
+INF = float("inf")
+
+
+def a_star_bidireccional(grid, inicio, objetivo, observador=None, heuristica="octil"):
+    """Busca el camino de menor costo avanzando desde ambos extremos.
+
+    Recibe los mismos argumentos que `busqueda.a_star` y devuelve un
+    `Resultado` equivalente; admite costos de terreno.
+    """
+    t0 = time.perf_counter()
+    heuristica = obtener_heuristica(heuristica)
+    rechazo = rechazo_inmediato(grid, inicio, objetivo, observador, t0)
+    if rechazo is not None:
+        return rechazo
+    libre = memoryview(grid.ocupacion.reshape(-1))
+    terreno = memoryview(grid.costos.reshape(-1))
+    filas, columnas = grid.filas, grid.columnas
+    desplazamientos = grid.desplazamientos
+
+    nodo_inicio = grid.indice(inicio)
+    nodo_objetivo = grid.indice(objetivo)
+    # Índice 0: búsqueda hacia adelante desde el inicio; 1: hacia atrás desde el objetivo
+    g_score = ({nodo_inicio: 0}, {nodo_objetivo: 0})
+    came_from = ({}, {})
+
+    def potencial(posicion):
+        return (heuristica(posicion, objetivo) - heuristica(inicio, posicion)) / 2
+
+    signos = (1, -1)  # Hacia atrás el potencial cambia de signo
+    colas = (ConjuntoAbierto(), ConjuntoAbierto())
+    colas[0].agregar(nodo_inicio, 0, potencial(inicio))
+    colas[1].agregar(nodo_objetivo, 0, -potencial(objetivo))
+
+    mejor = 0 if nodo_inicio == nodo_objetivo else INF  # μ
+    encuentro = nodo_inicio if nodo_inicio == nodo_objetivo else None
+    expandidos = 0
+
+    while colas[0].minimo(g_score[0]) + colas[1].minimo(g_score[1]) < mejor - TOLERANCIA:
+        lado = 0 if len(colas[0]) <= len(colas[1]) else 1
+        g_lado, g_otro = g_score[lado], g_score[1 - lado]
+        cola, padres, signo = colas[lado], came_from[lado], signos[lado]
+        current, g_current = cola.extraer(g_lado)
+        expandidos += 1
+
+        fila, col = divmod(current, columnas)
+        for dx, dy, delta, paso in desplazamientos:
+            if not (0 <= fila + dx < filas and 0 <= col + dy < columnas):
+                continue
+            vecino = current + delta
+            if libre[vecino] != LIBRE:
+                continue
+            # Entrar en una celda cuesta su terreno: hacia atrás la arista va de vecino a current
+            tentative_g_score = g_current + paso * terreno[vecino if lado == 0 else current]
+            if tentative_g_score < g_lado.get(vecino, INF) - TOLERANCIA:
+                g_lado[vecino] = tentative_g_score
+                padres[vecino] = current
+                posicion = divmod(vecino, columnas)
+                cola.agregar(vecino, tentative_g_score, signo * potencial(posicion))
+                if observador is not None:
+                    observador.nodo_abierto(posicion)
+                otro = g_otro.get(vecino)
+                if otro is not None and tentative_g_score + otro < mejor - TOLERANCIA:
+                    mejor = tentative_g_score + otro
+                    encuentro = vecino
+
+        if observador is not None:
+            observador.nodo_cerrado((fila, col))
+
+    camino = []
+    if encuentro is not None:
+        celda = encuentro
+        while celda != nodo_inicio:
+            camino.append(celda)
+            celda = came_from[0][celda]
+        camino.append(nodo_inicio)
+        camino.reverse()
+        celda = encuentro
+        while celda != nodo_objetivo:
+            celda = came_from[1][celda]
+            camino.append(celda)
+        camino = [grid.posicion(celda) for celda in camino]
+
+    costo = costo_camino(camino, grid) if camino else INF
+    resultado = Resultado(camino, costo, expandidos, colas[0].inserciones + colas[1].inserciones,
+                          time.perf_counter() - t0, cota=1)
+    if observador is not None:
+        observador.terminado(resultado)
+    return resultado
+
+
+def comparar_en_laberintos(tamano=201, laberintos=5, semilla=0, apertura=0.0):
+    """Resuelve esquina a esquina en laberintos generados con A* y A* bidireccional.
+
+    Devuelve una lista de (semilla, Resultado de a_star, Resultado bidireccional).
+    """
+    filas = []
+    for k in range(laberintos):
+        ocupacion = generar_laberinto(tamano, semilla=semilla + k, apertura=apertura)
+        grid = Grid.desde_arreglo(ocupacion)
+        inicio, objetivo = (1, 1), (grid.filas - 2 - (grid.filas % 2 == 0),
+                                    grid.columnas - 2 - (grid.columnas % 2 == 0))
+        filas.append((semilla + k, a_star(grid, inicio, objetivo),
+                      a_star_bidireccional(grid, inicio, objetivo)))
+    return filas
+
+
+if __name__ == "__main__":
+    for apertura in (0.0, 0.05, 0.3):
+        print(f"\nLaberintos 201x201 con apertura {apertura}")
+        print(f"{'semilla':>7} {'costo':>9} {'exp. A*':>9} {'exp. bidir':>10} "
+              f"{'ms A*':>8} {'ms bidir':>9}")
+        for semilla, uni, bidir in comparar_en_laberintos(apertura=apertura):
+            print(f"{semilla:>7} {uni.costo:>9.1f} {uni.expandidos:>9} {bidir.expandidos:>10} "
+                  f"{uni.tiempo * 1000:>8.1f} {bidir.tiempo * 1000:>9.1f}")
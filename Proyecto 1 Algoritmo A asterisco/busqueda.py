@@ -0,0 +1,265 @@
+"""Motor de búsqueda A* independiente de la interfaz gráfica.
+
+Este módulo no importa pygame: se puede usar desde scripts, pruebas o
+servidores sin abrir ninguna ventana. La visualización se engancha como un
+observador opcional que recibe los eventos de la búsqueda.
+"""
+import time
+from heapq import heappop, heappush
+
+from grid import COSTO_DIAGONAL, COSTO_ORTOGONAL
+from heuristicas import HEURISTICAS, obtener_heuristica
+
+# Sumar 1.4 en punto flotante (y guardar g en float32) deja ruido en los
+# últimos decimales: caminos de igual costo se verían distintos. Las mejoras
+# menores a TOLERANCIA se ignoran y f se redondea a DECIMALES_F para que los
+# empates se resuelvan por h y no por el ruido.
+TOLERANCIA = 1e-3
+DECIMALES_F = 3
+
+# Peso de la heurística en el modo "ponderado": el camino cuesta a lo sumo
+# PESO_PONDERADO veces el óptimo
+PESO_PONDERADO = 2.0
+
+
+class Resultado:
+    """Camino encontrado por una búsqueda junto con sus estadísticas"""
+
+    def __init__(self, camino, costo, expandidos, abiertos, tiempo, cota=None):
+        self.camino = camino          # Lista de posiciones (fila, col) desde el inicio hasta el objetivo
+        self.costo = costo            # Costo total del camino (inf si no existe)
+        self.expandidos = expandidos  # Nodos sacados de la cola y expandidos
+        self.abiertos = abiertos      # Inserciones en la cola de prioridad
+        self.tiempo = tiempo          # Segundos de búsqueda
+        self.cota = cota              # costo <= cota * óptimo (None si no hay garantía conocida)
+
+    @property
+    def encontrado(self):
+        return bool(self.camino)
+
+    def __bool__(self):
+        return self.encontrado
+
+    def __repr__(self):
+        return (f"Resultado(encontrado={self.encontrado}, costo={self.costo:.1f}, "
+                f"expandidos={self.expandidos}, abiertos={self.abiertos}, "
+                f"tiempo={self.tiempo * 1000:.2f} ms)")
+
+
+class Observador:
+    """Recibe los eventos de la búsqueda. Todos los métodos son opcionales."""
+
+    def nodo_abierto(self, pos):
+        pass
+
+    def nodo_cerrado(self, pos):
+        pass
+
+    def terminado(self, resultado):
+        pass
+
+
+class ObservadorLimitado(Observador):
+    """Observador que llama a `dibujar` como máximo `fps` veces por segundo"""
+
+    def __init__(self, dibujar, fps=30):
+        self.dibujar = dibujar
+        self.intervalo = 1 / fps if fps else 0
+        self._ultimo = float("-inf")
+
+    def refrescar(self):
+        ahora = time.perf_counter()
+        if ahora - self._ultimo >= self.intervalo:
+            self._ultimo = ahora
+            self.dibujar()
+
+    def nodo_cerrado(self, pos):
+        self.refrescar()
+
+    def terminado(self, resultado):
+        self.dibujar()  # El último cuadro siempre se dibuja
+
+
+class ConjuntoAbierto:
+    """Cola de prioridad basada en heapq con borrado perezoso.
+
+    Cada entrada es (f, h, g, nodo): los empates en f se resuelven a favor de
+    la menor h. Cuando un nodo abierto mejora se vuelve a insertar; la entrada
+    vieja se descarta al extraerla porque su g ya no es la mejor conocida.
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.inserciones = 0
+        self.descartadas = 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def agregar(self, nodo, g, h):
+        heappush(self.heap, (round(g + h, DECIMALES_F), h, g, nodo))
+        self.inserciones += 1
+
+    def extraer(self, g_score):
+        """Devuelve (nodo, g) de la entrada vigente con menor f, o None si no quedan"""
+        heap = self.heap
+        while heap:
+            _, _, g, nodo = heappop(heap)
+            if g <= g_score[nodo]:
+                return nodo, g
+            self.descartadas += 1
+        return None
+
+    def minimo(self, g_score):
+        """f de la entrada vigente con menor f, sin extraerla (inf si no quedan)"""
+        heap = self.heap
+        while heap and heap[0][2] > g_score[heap[0][3]]:
+            heappop(heap)
+            self.descartadas += 1
+        return heap[0][0] if heap else float("inf")
+
+
+def costo_camino(camino, grid=None):
+    """Suma en doble precisión los costos de los pasos de un camino de posiciones.
+
+    Si se pasa el `grid`, cada paso se multiplica por el costo de terreno de
+    la celda a la que entra.
+    """
+    total = 0
+    for (f1, c1), (f2, c2) in zip(camino, camino[1:]):
+        paso = COSTO_DIAGONAL if f1 != f2 and c1 != c2 else COSTO_ORTOGONAL
+        total += paso if grid is None else paso * grid.costo((f2, c2))
+    return total
+
+
+def rechazo_inmediato(grid, inicio, objetivo, observador, t0):
+    """Devuelve un Resultado vacío si las componentes del grid descartan la consulta.
+
+    Solo aplica cuando el grid tiene `componentes` (ver componentes.py); en
+    ese caso inicio y objetivo en componentes distintas se responden sin
+    expandir ningún nodo. Devuelve None si hay que buscar.
+    """
+    if grid.componentes is None or grid.componentes.conectados(inicio, objetivo):
+        return None
+    resultado = Resultado([], float("inf"), 0, 0, time.perf_counter() - t0)
+    if observador is not None:
+        observador.terminado(resultado)
+    return resultado
+
+
+def a_star(grid, inicio, objetivo, observador=None, heuristica="octil", peso=1):
+    """Busca el camino de menor costo entre las posiciones inicio y objetivo.
+
+    `grid` es un `Grid`; las posiciones son tuplas (fila, col). `heuristica`
+    es un nombre de `HEURISTICAS` o una función h(p1, p2). La búsqueda corre
+    sin dibujar nada; si se pasa un `observador` se le notifican las
+    posiciones abiertas y cerradas.
+
+    Con `peso` > 1 se usa Weighted A* (f = g + peso * h): expande menos
+    nodos y el camino cuesta a lo sumo `peso` veces el óptimo.
+    """
+    t0 = time.perf_counter()
+    heuristica = obtener_heuristica(heuristica)
+    if peso < 1:
+        raise ValueError(f"El peso de la heurística debe ser >= 1: {peso}")
+    rechazo = rechazo_inmediato(grid, inicio, objetivo, observador, t0)
+    if rechazo is not None:
+        return rechazo
+    # Las memoryview devuelven floats/ints de Python y escriben en los arreglos de NumPy
+    g_score = memoryview(grid.g)
+    came_from = memoryview(grid.padre)
+
+    nodo_inicio = grid.indice(inicio)
+    nodo_objetivo = grid.indice(objetivo)
+
+    open_set = ConjuntoAbierto()
+    g_score[nodo_inicio] = 0
+    open_set.agregar(nodo_inicio, 0, peso * heuristica(inicio, objetivo))
+    tocados = [nodo_inicio]
+
+    expandidos = 0
+    camino = []
+
+    try:
+        while True:
+            entrada = open_set.extraer(g_score)
+            if entrada is None:
+                break
+            current, g_current = entrada
+            expandidos += 1
+
+            if current == nodo_objetivo:
+                camino = reconstruir_camino(grid, current)
+                break
+
+            for vecino, costo in grid.vecinos(current):
+                tentative_g_score = g_current + costo
+
+                if tentative_g_score < g_score[vecino] - TOLERANCIA:
+                    if came_from[vecino] < 0 and vecino != nodo_inicio:
+                        tocados.append(vecino)
+                    came_from[vecino] = current
+                    g_score[vecino] = tentative_g_score
+                    # Se vuelve a leer g ya redondeado a float32 para que la
+                    # entrada coincida con el arreglo al extraerla
+                    open_set.agregar(vecino, g_score[vecino],
+                                     peso * heuristica(grid.posicion(vecino), objetivo))
+                    if observador is not None:
+                        observador.nodo_abierto(grid.posicion(vecino))
+
+            if observador is not None:
+                observador.nodo_cerrado(grid.posicion(current))
+    finally:
+        grid.limpiar(tocados)
+
+    costo = costo_camino(camino, grid) if camino else float("inf")
+    resultado = Resultado(camino, costo, expandidos, open_set.inserciones,
+                          time.perf_counter() - t0, cota=peso)
+    if observador is not None:
+        observador.terminado(resultado)
+    return resultado
+
+
+MODOS = ("a_star", "jps", "ponderado", "ara", "bidireccional")
+
+
+def buscar(grid, inicio, objetivo, modo="a_star", **opciones):
+    """Ejecuta la búsqueda con el motor indicado por `modo` (ver `MODOS`).
+
+    "ponderado" es Weighted A* con `peso=PESO_PONDERADO` salvo que se pase
+    otro; "ara" es ARA* (ver ara.py) y admite `limite` en segundos.
+    """
+    if modo == "a_star":
+        return a_star(grid, inicio, objetivo, **opciones)
+    if modo == "ponderado":
+        opciones.setdefault("peso", PESO_PONDERADO)
+        return a_star(grid, inicio, objetivo, **opciones)
+    # Imports diferidos: estos módulos importan busqueda.py
+    if modo == "jps":
+        from jps import jps
+        return jps(grid, inicio, objetivo, **opciones)
+    if modo == "ara":
+        from ara import ara_star
+        return ara_star(grid, inicio, objetivo, **opciones)
+    if modo == "bidireccional":
+        from bidireccional import a_star_bidireccional
+        return a_star_bidireccional(grid, inicio, objetivo, **opciones)
+    raise ValueError(f"Modo de búsqueda desconocido: {modo!r}. Opciones: {', '.join(MODOS)}")
+
+
+def comparar_heuristicas(grid, inicio, objetivo, nombres=None):
+    """Ejecuta la misma consulta con varias heurísticas y devuelve {nombre: Resultado}"""
+    if nombres is None:
+        nombres = [nombre for nombre in HEURISTICAS if nombre != "dijkstra"]
+    return {nombre: a_star(grid, inicio, objetivo, heuristica=nombre) for nombre in nombres}
+
+
+def reconstruir_camino(grid, current):
+    """Devuelve la lista de posiciones desde el inicio hasta el índice `current`"""
+    came_from = grid.padre
+    camino = [grid.posicion(current)]
+    while came_from[current] >= 0:
+        current = int(came_from[current])
+        camino.append(grid.posicion(current))
+    camino.reverse()
+    return camino
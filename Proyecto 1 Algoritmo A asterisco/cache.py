@@ -0,0 +1,136 @@
+"""Caché LRU de caminos para consultas repetidas sobre un mapa casi estático.
+
+Cada entrada se guarda con la clave (inicio, objetivo, heurística, versión del
+mapa) y se invalida con precisión cuando el grid avisa un cambio:
+
+- Una pared nueva (o un costo de terreno que cambia) solo puede empeorar los
+  caminos que pasan por esa celda; los demás siguen siendo óptimos.
+- Quitar una pared (o bajar un costo) puede abrir un atajo. Un camino por la
+  celda c cuesta al menos octil(inicio, c) + octil(c, objetivo), así que solo
+  se descartan las entradas que cuestan más que esa cota.
+
+La versión del mapa cubre los cambios que la caché no alcanzó a ver: si
+`grid.version` avanzó sin que llegara el aviso, se vacía todo.
+"""
+import time
+from collections import OrderedDict
+
+from busqueda import TOLERANCIA, Resultado, buscar
+from heuristicas import octil
+
+CAPACIDAD = 1024
+
+
+class CacheCaminos:
+    """Resuelve consultas con `busqueda.buscar` y recuerda las últimas `capacidad`"""
+
+    def __init__(self, grid, capacidad=CAPACIDAD, modo="a_star"):
+        self.grid = grid
+        self.capacidad = capacidad
+        self.modo = modo
+        self.entradas = OrderedDict()  # clave -> (camino, costo), de la menos a la más reciente
+        self.por_celda = {}            # posición -> claves cuyos caminos pasan por ella
+        self.version = 0               # Parte de la clave; cambia al vaciar la caché
+        self._version_grid = grid.version
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidadas = 0
+        self.desalojadas = 0
+        grid.suscribir(self._pared_cambiada)
+        grid.suscribir_costo(self._costo_cambiado)
+
+    def cerrar(self):
+        """Deja de escuchar los cambios del grid"""
+        self.grid.desuscribir(self._pared_cambiada)
+        self.grid.desuscribir_costo(self._costo_cambiado)
+
+    def __len__(self):
+        return len(self.entradas)
+
+    @property
+    def tasa_aciertos(self):
+        consultas = self.aciertos + self.fallos
+        return self.aciertos / consultas if consultas else 0.0
+
+    def estadisticas(self):
+        return {"aciertos": self.aciertos, "fallos": self.fallos,
+                "tasa_aciertos": self.tasa_aciertos, "invalidadas": self.invalidadas,
+                "desalojadas": self.desalojadas, "entradas": len(self.entradas)}
+
+    # --- Consulta -------------------------------------------------------------
+
+    def buscar(self, inicio, objetivo, heuristica="octil"):
+        """Devuelve el `Resultado` guardado o busca y lo guarda.
+
+        Un acierto devuelve una copia del camino con `expandidos = 0`.
+        """
+        t0 = time.perf_counter()
+        if self.grid.version != self._version_grid:
+            self.vaciar()  # Hubo cambios sin aviso: nada de lo guardado es confiable
+        clave = (tuple(inicio), tuple(objetivo), heuristica, self.version)
+        entrada = self.entradas.get(clave)
+        if entrada is not None:
+            self.entradas.move_to_end(clave)
+            self.aciertos += 1
+            camino, costo = entrada
+            return Resultado(list(camino), costo, 0, 0, time.perf_counter() - t0, cota=1)
+
+        self.fallos += 1
+        resultado = buscar(self.grid, clave[0], clave[1], modo=self.modo, heuristica=heuristica)
+        self._guardar(clave, resultado)
+        return resultado
+
+    def vaciar(self):
+        self.entradas.clear()
+        self.por_celda.clear()
+        self.version += 1
+        self._version_grid = self.grid.version
+
+    def _guardar(self, clave, resultado):
+        camino = tuple(resultado.camino)
+        self.entradas[clave] = (camino, resultado.costo)
+        for pos in camino:
+            self.por_celda.setdefault(pos, set()).add(clave)
+        if len(self.entradas) > self.capacidad:
+            antigua, _ = next(iter(self.entradas.items()))
+            self._quitar(antigua)
+            self.desalojadas += 1
+
+    def _quitar(self, clave):
+        camino, _ = self.entradas.pop(clave)
+        for pos in camino:
+            claves = self.por_celda[pos]
+            claves.discard(clave)
+            if not claves:
+                del self.por_celda[pos]
+
+    # --- Invalidación ---------------------------------------------------------
+
+    def _invalidar_camino(self, pos):
+        """Quita las entradas cuyo camino pasa por `pos`"""
+        for clave in list(self.por_celda.get(pos, ())):
+            self._quitar(clave)
+            self.invalidadas += 1
+
+    def _invalidar_atajos(self, pos):
+        """Quita las entradas que un camino por `pos` podría mejorar"""
+        for clave, (_, costo) in list(self.entradas.items()):
+            inicio, objetivo = clave[0], clave[1]
+            if costo > octil(inicio, pos) + octil(pos, objetivo) + TOLERANCIA:
+                self._quitar(clave)
+                self.invalidadas += 1
+
+    def _pared_cambiada(self, pos, pared):
+        pos = tuple(pos)
+        if pared:
+            self._invalidar_camino(pos)
+        else:
+            self._invalidar_atajos(pos)
+        self._version_grid = self.grid.version
+
+    def _costo_cambiado(self, pos, _):
+        # No se sabe si el costo subió o bajó: se aplican ambas reglas
+        pos = tuple(pos)
+        self._invalidar_camino(pos)
+        self._invalidar_atajos(pos)
+        self._version_grid = self.grid.version
@@ -0,0 +1,225 @@
+"""Componentes conexas de celdas libres del grid.
+
+Dos celdas libres están en la misma componente si se puede ir de una a otra
+con los movimientos del grid (8 direcciones, las diagonales pueden cortar
+esquinas). Si inicio y objetivo tienen etiquetas distintas no hay camino y la
+consulta se rechaza sin buscar.
+"""
+import numpy as np
+
+from grid import LIBRE
+
+
+def etiquetar_componentes(grid):
+    """Etiqueta las componentes 8-conexas de celdas libres.
+
+    Devuelve (etiquetas, n): `etiquetas` es un arreglo int32 (filas, columnas)
+    con 0 en las paredes y 1..n en las celdas libres. Trabaja por tramos
+    horizontales de celdas libres en lugar de celda por celda, así que el
+    costo en Python depende del número de tramos y no del área del mapa.
+    """
+    libre = grid.ocupacion == LIBRE
+    filas, columnas = libre.shape
+
+    # 1) Tramos horizontales [inicio, fin) de celdas libres en cada fila
+    borde = np.zeros((filas, 1), dtype=np.int8)
+    cambios = np.diff(np.hstack([borde, libre.astype(np.int8), borde]), axis=1)
+    fila_tramo, inicio_tramo = np.nonzero(cambios == 1)
+    _, fin_tramo = np.nonzero(cambios == -1)
+    total = len(fila_tramo)
+    if total == 0:
+        return np.zeros((filas, columnas), dtype=np.int32), 0
+
+    # 2) Unión de tramos de filas consecutivas que se tocan (incluye diagonal)
+    primero_fila = np.searchsorted(fila_tramo, np.arange(filas + 1)).tolist()
+    inicios = inicio_tramo.tolist()
+    fines = fin_tramo.tolist()
+    padre = list(range(total))
+
+    def raiz(i):
+        while padre[i] != i:
+            padre[i] = padre[padre[i]]
+            i = padre[i]
+        return i
+
+    for fila in range(filas - 1):
+        i, fin_i = primero_fila[fila], primero_fila[fila + 1]
+        j, fin_j = fin_i, primero_fila[fila + 2]
+        while i < fin_i and j < fin_j:
+            if inicios[i] <= fines[j] and inicios[j] <= fines[i]:
+                ri, rj = raiz(i), raiz(j)
+                if ri != rj:
+                    padre[max(ri, rj)] = min(ri, rj)
+            if fines[i] < fines[j]:
+                i += 1
+            else:
+                j += 1
+
+    # 3) Etiquetas compactas 1..n y pintado vectorizado con sumas acumuladas
+    raices = np.fromiter((raiz(i) for i in range(total)), dtype=np.int64, count=total)
+    _, etiqueta_tramo = np.unique(raices, return_inverse=True)
+    etiqueta_tramo = etiqueta_tramo.astype(np.int32) + 1
+    n = int(etiqueta_tramo.max())
+
+    marcas = np.zeros((filas, columnas + 1), dtype=np.int32)
+    np.add.at(marcas, (fila_tramo, inicio_tramo), etiqueta_tramo)
+    np.add.at(marcas, (fila_tramo, fin_tramo), -etiqueta_tramo)
+    etiquetas = np.ascontiguousarray(np.cumsum(marcas, axis=1, dtype=np.int32)[:, :columnas])
+    return etiquetas, n
+
+
+def conectados(etiquetas, inicio, objetivo):
+    """Indica si puede existir un camino entre dos posiciones"""
+    etiqueta = etiquetas[inicio]
+    return etiqueta != 0 and etiqueta == etiquetas[objetivo]
+
+
+class Componentes:
+    """Etiquetas de componentes que se mantienen al día cuando se edita el grid.
+
+    Se suscribe a `hacer_pared`/`restablecer` del grid: quitar una pared une
+    las componentes vecinas y poner una puede partir la suya. En ambos casos
+    solo se reetiquetan las piezas más pequeñas, no el mapa completo.
+    """
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.etiquetas, self.n = etiquetar_componentes(grid)
+        self._planas = self.etiquetas.reshape(-1)
+        conteo = np.bincount(self._planas)
+        self.tamanos = {etiqueta: int(conteo[etiqueta]) for etiqueta in range(1, len(conteo))
+                        if conteo[etiqueta]}
+        self._siguiente = self.n + 1
+        grid.componentes = self
+        grid.suscribir(self._celda_cambiada)
+
+    def conectados(self, inicio, objetivo):
+        return conectados(self.etiquetas, inicio, objetivo)
+
+    def _nueva_etiqueta(self):
+        etiqueta = self._siguiente
+        self._siguiente += 1
+        return etiqueta
+
+    def _celda_cambiada(self, pos, pared):
+        if pared:
+            self._agregar_pared(self.grid.indice(pos))
+        else:
+            self._quitar_pared(self.grid.indice(pos))
+
+    def _quitar_pared(self, celda):
+        """La celda quedó libre: se une a las componentes de sus vecinos"""
+        etiquetas = self._planas
+        vecinas = {etiquetas[vecino]: vecino for vecino, _ in self.grid.vecinos(celda)}
+        if not vecinas:
+            etiqueta = self._nueva_etiqueta()
+            etiquetas[celda] = etiqueta
+            self.tamanos[etiqueta] = 1
+            return
+        # Se conserva la etiqueta de la componente más grande y se inundan las demás
+        mayor = max(vecinas, key=self.tamanos.__getitem__)
+        etiquetas[celda] = mayor
+        self.tamanos[mayor] += 1
+        for etiqueta, semilla in vecinas.items():
+            if etiqueta != mayor:
+                self.tamanos[mayor] += len(self._inundar(semilla, etiqueta, mayor))
+                del self.tamanos[etiqueta]
+
+    def _inundar(self, semilla, anterior, nueva):
+        """Cambia a `nueva` la etiqueta de la región `anterior` que contiene a `semilla`"""
+        etiquetas = self._planas
+        etiquetas[semilla] = nueva
+        pila = [semilla]
+        visitadas = [semilla]
+        while pila:
+            celda = pila.pop()
+            for vecino, _ in self.grid.vecinos(celda):
+                if etiquetas[vecino] == anterior:
+                    etiquetas[vecino] = nueva
+                    pila.append(vecino)
+                    visitadas.append(vecino)
+        return visitadas
+
+    def _agregar_pared(self, celda):
+        """La celda quedó bloqueada: su componente puede partirse en varias"""
+        etiquetas = self._planas
+        etiqueta = int(etiquetas[celda])
+        etiquetas[celda] = 0
+        if etiqueta == 0:
+            return
+        self.tamanos[etiqueta] -= 1
+        if self.tamanos[etiqueta] == 0:
+            del self.tamanos[etiqueta]
+            return
+        semillas = self._grupos_locales([vecino for vecino, _ in self.grid.vecinos(celda)])
+        if len(semillas) > 1:
+            self._separar(semillas, etiqueta)
+
+    def _grupos_locales(self, vecinos):
+        """Agrupa los vecinos libres que se tocan entre sí y devuelve un representante por grupo"""
+        posiciones = [self.grid.posicion(vecino) for vecino in vecinos]
+        grupo = list(range(len(vecinos)))
+        for i, (f1, c1) in enumerate(posiciones):
+            for j in range(i):
+                f2, c2 = posiciones[j]
+                if abs(f1 - f2) <= 1 and abs(c1 - c2) <= 1:
+                    viejo, nuevo = grupo[i], grupo[j]
+                    grupo = [nuevo if g == viejo else g for g in grupo]
+        representantes = {}
+        for vecino, g in zip(vecinos, grupo):
+            representantes.setdefault(g, vecino)
+        return list(representantes.values())
+
+    def _separar(self, semillas, etiqueta):
+        """Recorre en paralelo desde cada semilla para detectar piezas desconectadas.
+
+        Las búsquedas que se encuentran pertenecen a la misma pieza. Una pieza
+        cuyas búsquedas se agotan sin encontrar a las demás queda separada y
+        recibe una etiqueta nueva. Cuando solo queda una pieza sin resolver,
+        esa conserva la etiqueta original: el trabajo es proporcional a las
+        piezas pequeñas que se separan.
+        """
+        etiquetas = self._planas
+        k = len(semillas)
+        fronteras = [[semilla] for semilla in semillas]
+        visitadas = [[semilla] for semilla in semillas]
+        dueno = {semilla: i for i, semilla in enumerate(semillas)}
+        grupo = list(range(k))
+
+        def raiz(i):
+            while grupo[i] != i:
+                i = grupo[i]
+            return i
+
+        pendientes = set(range(k))
+        while len({raiz(i) for i in pendientes}) > 1:
+            for i in list(pendientes):
+                if not fronteras[i]:
+                    continue
+                celda = fronteras[i].pop()
+                for vecino, _ in self.grid.vecinos(celda):
+                    if etiquetas[vecino] != etiqueta:
+                        continue
+                    otro = dueno.get(vecino)
+                    if otro is None:
+                        dueno[vecino] = i
+                        fronteras[i].append(vecino)
+                        visitadas[i].append(vecino)
+                    elif raiz(otro) != raiz(i):
+                        grupo[raiz(otro)] = raiz(i)
+
+            # Una pieza está agotada cuando ninguna de sus búsquedas tiene frontera
+            piezas = {}
+            for i in pendientes:
+                piezas.setdefault(raiz(i), []).append(i)
+            restantes = len(piezas)
+            for miembros in piezas.values():
+                if restantes > 1 and not any(fronteras[i] for i in miembros):
+                    nueva = self._nueva_etiqueta()
+                    celdas = [celda for i in miembros for celda in visitadas[i]]
+                    for celda in celdas:
+                        etiquetas[celda] = nueva
+                    self.tamanos[nueva] = len(celdas)
+                    self.tamanos[etiqueta] -= len(celdas)
+                    pendientes.difference_update(miembros)
+                    restantes -= 1
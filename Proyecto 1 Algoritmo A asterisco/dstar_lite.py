@@ -0,0 +1,153 @@
+"""Replanificación incremental con D* Lite.
+
+A* empieza de cero en cada búsqueda. D* Lite busca desde el objetivo hacia el
+inicio y conserva sus valores g/rhs entre búsquedas: cuando se pone o quita
+una pared solo se reparan las celdas cuyo costo al objetivo cambió, así que
+volver a consultar un mapa que cambia poco cuesta una fracción de una
+búsqueda completa. También admite mover el inicio sin perder el trabajo.
+"""
+import time
+from heapq import heappop, heappush
+
+from busqueda import DECIMALES_F, Resultado, costo_camino
+from grid import LIBRE
+from heuristicas import obtener_heuristica
+
+INF = float("inf")
+
+
+class ReplanificadorDStarLite:
+    """Mantiene el camino más corto de `inicio` a `objetivo` mientras se edita el grid"""
+
+    def __init__(self, grid, inicio, objetivo, heuristica="octil"):
+        self.grid = grid
+        self.heuristica = obtener_heuristica(heuristica)
+        self.inicio = grid.indice(inicio)
+        self.objetivo = grid.indice(objetivo)
+        self._libre = memoryview(grid.ocupacion.reshape(-1))
+        self.g = {}
+        self.rhs = {self.objetivo: 0}
+        self.km = 0
+        self.cola = []
+        self.claves = {}  # Clave vigente de cada celda en la cola (borrado perezoso)
+        self.inserciones = 0
+        self._insertar(self.objetivo)
+        grid.suscribir(self._celda_cambiada)
+        grid.suscribir_costo(self._celda_cambiada)
+
+    def cerrar(self):
+        """Deja de escuchar los cambios del grid"""
+        self.grid.desuscribir(self._celda_cambiada)
+        self.grid.desuscribir_costo(self._celda_cambiada)
+
+    # --- Núcleo de D* Lite ----------------------------------------------------
+
+    def _h(self, celda):
+        return self.heuristica(self.grid.posicion(self.inicio), self.grid.posicion(celda))
+
+    def _clave(self, celda):
+        # Se redondea para que el ruido de sumar 1.4 no rompa los empates con la
+        # clave del inicio (la búsqueda terminaría antes de tiempo)
+        minimo = min(self.g.get(celda, INF), self.rhs.get(celda, INF))
+        if minimo == INF:
+            return INF, INF
+        return round(minimo + self._h(celda) + self.km, DECIMALES_F), round(minimo, DECIMALES_F)
+
+    def _insertar(self, celda):
+        clave = self._clave(celda)
+        self.claves[celda] = clave
+        heappush(self.cola, (clave, celda))
+        self.inserciones += 1
+
+    def _actualizar_celda(self, celda):
+        if celda != self.objetivo:
+            if self._libre[celda] != LIBRE:
+                self.rhs[celda] = INF
+            else:
+                g = self.g
+                self.rhs[celda] = min((costo + g.get(vecino, INF)
+                                       for vecino, costo in self.grid.vecinos(celda)), default=INF)
+        self.claves.pop(celda, None)
+        if self.g.get(celda, INF) != self.rhs.get(celda, INF):
+            self._insertar(celda)
+
+    def _tope(self):
+        """Clave mínima vigente de la cola, descartando entradas viejas"""
+        cola, claves = self.cola, self.claves
+        while cola and claves.get(cola[0][1]) != cola[0][0]:
+            heappop(cola)
+        return cola[0][0] if cola else (INF, INF)
+
+    def _calcular(self, observador=None):
+        expandidos = 0
+        g, rhs, inicio = self.g, self.rhs, self.inicio
+        while (self._tope() < self._clave(inicio)
+               or rhs.get(inicio, INF) != g.get(inicio, INF)):
+            clave_vieja, celda = heappop(self.cola)
+            del self.claves[celda]
+            expandidos += 1
+            clave_nueva = self._clave(celda)
+            if clave_vieja < clave_nueva:
+                self._insertar(celda)
+                continue
+            if g.get(celda, INF) > rhs.get(celda, INF):
+                g[celda] = rhs[celda]
+                afectadas = [vecino for vecino, _ in self.grid.vecinos(celda)]
+            else:
+                g[celda] = INF
+                afectadas = [vecino for vecino, _ in self.grid.vecinos(celda)] + [celda]
+            for vecino in afectadas:
+                self._actualizar_celda(vecino)
+            if observador is not None:
+                observador.nodo_cerrado(self.grid.posicion(celda))
+        return expandidos
+
+    # --- Cambios en el mapa y en el inicio -----------------------------------
+
+    def _celda_cambiada(self, pos, _):
+        celda = self.grid.indice(pos)
+        # Una pared o un costo de terreno nuevo cambia las aristas de la celda
+        # con sus 8 vecinos, estén libres o no
+        fila, col = pos
+        for dx, dy, delta, _ in self.grid.desplazamientos:
+            if self.grid.dentro((fila + dx, col + dy)):
+                self._actualizar_celda(celda + delta)
+        self._actualizar_celda(celda)
+
+    def mover_inicio(self, pos):
+        """Cambia el inicio (p. ej. el agente avanzó) conservando la búsqueda previa"""
+        nuevo = self.grid.indice(pos)
+        self.km += self.heuristica(self.grid.posicion(self.inicio), pos)
+        self.inicio = nuevo
+
+    # --- Consulta -------------------------------------------------------------
+
+    def buscar(self, observador=None):
+        """Repara la búsqueda con los cambios pendientes y devuelve el camino actual.
+
+        `expandidos` cuenta solo las celdas procesadas en esta llamada.
+        """
+        t0 = time.perf_counter()
+        inserciones = self.inserciones
+        expandidos = self._calcular(observador)
+        camino = self._extraer_camino()
+        costo = costo_camino(camino, self.grid) if camino else INF
+        resultado = Resultado(camino, costo, expandidos, self.inserciones - inserciones,
+                              time.perf_counter() - t0, cota=1)
+        if observador is not None:
+            observador.terminado(resultado)
+        return resultado
+
+    def _extraer_camino(self):
+        g = self.g
+        celda = self.inicio
+        if (g.get(celda, INF) == INF or self._libre[celda] != LIBRE
+                or self._libre[self.objetivo] != LIBRE):
+            return []
+        camino = [self.grid.posicion(celda)]
+        for _ in range(len(self.grid)):
+            if celda == self.objetivo:
+                return camino
+            celda = min(self.grid.vecinos(celda), key=lambda par: par[1] + g.get(par[0], INF))[0]
+            camino.append(self.grid.posicion(celda))
+        return []
@@ -0,0 +1,175 @@
+"""Grid de ocupación compacto respaldado por arreglos de NumPy.
+
+Cada celda ocupa un byte en `ocupacion` más cuatro bytes en `costos`, `g` y
+`padre`, de modo que un mapa de 4096x4096 cabe en unos 220 MB en lugar de
+los gigabytes que ocuparían millones de objetos `Nodo`. Las celdas se
+identifican con un índice entero `fila * columnas + col`.
+
+`costos` guarda el costo de terreno de cada celda: entrar en ella cuesta el
+costo base del paso (1 o 1.4) multiplicado por ese valor. Los costos nunca
+son menores que 1 para que las heurísticas sigan siendo admisibles.
+"""
+import numpy as np
+
+LIBRE = 0
+PARED = 1
+
+COSTO_ORTOGONAL = 1
+COSTO_DIAGONAL = 1.4
+
+# Costo de terreno por defecto y mínimo permitido
+COSTO_TERRENO_MINIMO = 1.0
+
+# Desplazamientos (fila, col): primero los ortogonales y luego las diagonales
+DIRECCIONES = [
+    (-1, 0), (1, 0), (0, -1), (0, 1),       # Arriba, Abajo, Izquierda, Derecha
+    (-1, -1), (-1, 1), (1, -1), (1, 1)      # Diagonales
+]
+
+
+class Grid:
+    """Mapa de celdas libres o paredes con arreglos de trabajo para la búsqueda"""
+
+    def __init__(self, filas, columnas=None, ocupacion=None, costos=None):
+        if columnas is None:
+            columnas = filas
+        self.filas = filas
+        self.columnas = columnas
+        if ocupacion is None:
+            ocupacion = np.zeros((filas, columnas), dtype=np.uint8)
+        if costos is None:
+            costos = np.full((filas, columnas), COSTO_TERRENO_MINIMO, dtype=np.float32)
+        # Se usan los arreglos recibidos sin copiarlos (p. ej. memoria compartida entre procesos)
+        self.ocupacion = ocupacion
+        self.costos = costos
+        # Celdas con costo distinto de 1; JPS y HPA* solo admiten mapas uniformes
+        self.celdas_con_terreno = int(np.count_nonzero(costos != COSTO_TERRENO_MINIMO))
+        # Arreglos planos reutilizados por cada búsqueda
+        self.g = np.full(filas * columnas, np.inf, dtype=np.float32)
+        self.padre = np.full(filas * columnas, -1, dtype=np.int32)
+        # Cada dirección se precalcula una sola vez como (dx, dy, delta del índice, costo)
+        self.desplazamientos = [
+            (dx, dy, dx * columnas + dy, COSTO_DIAGONAL if dx and dy else COSTO_ORTOGONAL)
+            for dx, dy in DIRECCIONES
+        ]
+        self._libre = memoryview(self.ocupacion.reshape(-1))
+        self._costo = memoryview(self.costos.reshape(-1))
+        # Aumenta con cada cambio de pared o de costo hecho con los métodos del grid
+        self.version = 0
+        # Funciones f(pos, pared) a las que se avisa cuando una celda cambia
+        self.suscriptores = []
+        # Funciones f(pos, costo) a las que se avisa cuando cambia un costo de terreno
+        self.suscriptores_costo = []
+        self.componentes = None  # Se asigna al crear componentes.Componentes(grid)
+
+    @classmethod
+    def desde_arreglo(cls, ocupacion, costos=None):
+        """Crea un grid a partir de una matriz donde cualquier valor distinto de 0 es pared.
+
+        `costos` es una matriz opcional de la misma forma con el costo de
+        terreno de cada celda.
+        """
+        ocupacion = np.asarray(ocupacion)
+        if costos is not None:
+            costos = np.array(costos, dtype=np.float32)
+            if costos.shape != ocupacion.shape:
+                raise ValueError(f"La forma de los costos {costos.shape} no coincide "
+                                 f"con la del mapa {ocupacion.shape}")
+            if (costos < COSTO_TERRENO_MINIMO).any():
+                raise ValueError(f"Los costos de terreno deben ser >= {COSTO_TERRENO_MINIMO}")
+        grid = cls(*ocupacion.shape, costos=costos)
+        grid.ocupacion[ocupacion != 0] = PARED
+        return grid
+
+    def __len__(self):
+        return self.filas * self.columnas
+
+    def indice(self, pos):
+        fila, col = pos
+        return fila * self.columnas + col
+
+    def posicion(self, indice):
+        return divmod(indice, self.columnas)
+
+    def dentro(self, pos):
+        fila, col = pos
+        return 0 <= fila < self.filas and 0 <= col < self.columnas
+
+    def es_pared(self, pos):
+        return self.ocupacion[pos] == PARED
+
+    @property
+    def uniforme(self):
+        """True si todas las celdas tienen el costo de terreno mínimo"""
+        return self.celdas_con_terreno == 0
+
+    def costo(self, pos):
+        return float(self.costos[pos])
+
+    def fijar_costo(self, pos, costo):
+        """Cambia el costo de terreno de una celda y avisa a `suscriptores_costo`"""
+        if not costo >= COSTO_TERRENO_MINIMO:
+            raise ValueError(f"Los costos de terreno deben ser >= {COSTO_TERRENO_MINIMO}: {costo}")
+        anterior = self.costos[pos]
+        self.costos[pos] = costo
+        if self.costos[pos] == anterior:
+            return
+        if anterior == COSTO_TERRENO_MINIMO:
+            self.celdas_con_terreno += 1
+        elif self.costos[pos] == COSTO_TERRENO_MINIMO:
+            self.celdas_con_terreno -= 1
+        self.version += 1
+        for funcion in self.suscriptores_costo:
+            funcion(pos, float(self.costos[pos]))
+
+    def hacer_pared(self, pos):
+        self._cambiar(pos, PARED)
+
+    def restablecer(self, pos):
+        self._cambiar(pos, LIBRE)
+
+    def suscribir(self, funcion):
+        """Registra `funcion(pos, pared)`, llamada cada vez que una celda cambia de estado"""
+        self.suscriptores.append(funcion)
+
+    def desuscribir(self, funcion):
+        self.suscriptores.remove(funcion)
+
+    def suscribir_costo(self, funcion):
+        """Registra `funcion(pos, costo)`, llamada cada vez que cambia un costo de terreno"""
+        self.suscriptores_costo.append(funcion)
+
+    def desuscribir_costo(self, funcion):
+        self.suscriptores_costo.remove(funcion)
+
+    def _cambiar(self, pos, valor):
+        if self.ocupacion[pos] == valor:
+            return
+        self.ocupacion[pos] = valor
+        self.version += 1
+        for funcion in self.suscriptores:
+            funcion(pos, valor == PARED)
+
+    def vecinos(self, indice):
+        """Genera (vecino, costo) para cada celda libre alrededor de `indice`.
+
+        Los vecinos se calculan al expandir la celda a partir de la ocupación,
+        así que no hay preparación proporcional al tamaño del mapa. El costo
+        es el del paso multiplicado por el costo de terreno del vecino.
+        """
+        ocupacion = self._libre
+        terreno = self._costo
+        filas, columnas = self.filas, self.columnas
+        fila, col = divmod(indice, columnas)
+        for dx, dy, delta, costo in self.desplazamientos:
+            if 0 <= fila + dx < filas and 0 <= col + dy < columnas:
+                vecino = indice + delta
+                if ocupacion[vecino] == LIBRE:
+                    yield vecino, costo * terreno[vecino]
+
+    def limpiar(self, tocados):
+        """Restablece g y padre solo en las celdas tocadas por la última búsqueda"""
+        if tocados:
+            tocados = np.fromiter(tocados, dtype=np.int64, count=len(tocados))
+            self.g[tocados] = np.inf
+            self.padre[tocados] = -1
@@ -0,0 +1,59 @@
+"""Heurísticas para A* sobre el grid de 8 direcciones.
+
+Con movimientos ortogonales de costo 1 y diagonales de costo 1.4, la octil
+es la heurística exacta en un mapa sin paredes y por eso es la predeterminada.
+Chebyshev, la euclidiana escalada y cero también son admisibles; Manhattan
+sobreestima en diagonal y se conserva solo para comparar.
+"""
+import math
+
+from grid import COSTO_DIAGONAL, COSTO_ORTOGONAL
+
+# Factor que hace admisible la distancia euclidiana cuando la diagonal cuesta 1.4 < √2
+FACTOR_EUCLIDIANO = COSTO_DIAGONAL / (COSTO_ORTOGONAL * math.sqrt(2))
+
+
+def octil(p1, p2):
+    dx = abs(p1[0] - p2[0])
+    dy = abs(p1[1] - p2[1])
+    if dx < dy:
+        dx, dy = dy, dx
+    return COSTO_ORTOGONAL * (dx - dy) + COSTO_DIAGONAL * dy
+
+
+def chebyshev(p1, p2):
+    return COSTO_ORTOGONAL * max(abs(p1[0] - p2[0]), abs(p1[1] - p2[1]))
+
+
+def euclidiana(p1, p2):
+    return FACTOR_EUCLIDIANO * math.hypot(p1[0] - p2[0], p1[1] - p2[1])
+
+
+def manhattan(p1, p2):
+    return COSTO_ORTOGONAL * (abs(p1[0] - p2[0]) + abs(p1[1] - p2[1]))
+
+
+def cero(p1, p2):
+    """Sin heurística: A* se comporta como Dijkstra"""
+    return 0
+
+
+HEURISTICAS = {
+    "octil": octil,
+    "chebyshev": chebyshev,
+    "euclidiana": euclidiana,
+    "manhattan": manhattan,
+    "cero": cero,
+    "dijkstra": cero,
+}
+
+
+def obtener_heuristica(heuristica):
+    """Acepta el nombre de una heurística o directamente una función h(p1, p2)"""
+    if callable(heuristica):
+        return heuristica
+    try:
+        return HEURISTICAS[heuristica]
+    except KeyError:
+        raise ValueError(f"Heurística desconocida: {heuristica!r}. "
+                         f"Opciones: {', '.join(HEURISTICAS)}") from None
@@ -0,0 +1,312 @@
+"""Búsqueda jerárquica tipo HPA* para mapas grandes.
+
+El mapa se divide en clusters de `tamano` x `tamano` celdas. En cada borde
+entre clusters vecinos se eligen entradas (pares de celdas libres que cruzan
+el borde) y dentro de cada cluster se precalcula el costo entre sus entradas.
+Una consulta larga se resuelve primero sobre ese grafo abstracto, mucho más
+pequeño que el grid, y después se refina cada tramo con una búsqueda local
+dentro de un solo cluster.
+
+Los caminos son casi óptimos: el costo es exacto para la ruta devuelta, pero
+puede ser algo mayor que el de A* porque solo se cruza por las entradas.
+Cuando se editan paredes solo se reconstruyen los clusters afectados. Los
+costos de las entradas suponen un mapa sin costos de terreno, así que tanto
+el constructor como cada búsqueda rechazan un grid que no es uniforme.
+"""
+import time
+from heapq import heappop, heappush
+
+from busqueda import TOLERANCIA, Resultado, costo_camino, rechazo_inmediato
+from grid import COSTO_DIAGONAL, COSTO_ORTOGONAL, LIBRE
+from heuristicas import octil
+
+# Un tramo de cruce de al menos este largo recibe dos entradas, una en cada extremo
+LARGO_ENTRADA_DOBLE = 6
+
+
+class MapaJerarquico:
+    """Grafo abstracto de entradas entre clusters, mantenido al editar el grid"""
+
+    def __init__(self, grid, tamano=16):
+        if not grid.uniforme:
+            raise ValueError("MapaJerarquico requiere costos de terreno uniformes")
+        self.grid = grid
+        self.tamano = tamano
+        self.clusters_filas = -(-grid.filas // tamano)
+        self.clusters_columnas = -(-grid.columnas // tamano)
+        self._libre = memoryview(grid.ocupacion.reshape(-1))
+
+        self.transiciones = {}  # (cluster, cluster) -> [(a, b, costo)] que cruzan ese borde
+        self.entre = {}         # nodo -> {nodo en otro cluster: costo}
+        self.dentro = {}        # cluster -> {nodo: {nodo del mismo cluster: costo}}
+        self.nodos = {}         # cluster -> conjunto de nodos (celdas de entrada)
+        self.sucios = {(cf, cc) for cf in range(self.clusters_filas)
+                       for cc in range(self.clusters_columnas)}
+        grid.suscribir(self._celda_cambiada)
+
+    # --- Geometría de clusters -------------------------------------------
+
+    def cluster_de(self, indice):
+        fila, col = self.grid.posicion(indice)
+        return fila // self.tamano, col // self.tamano
+
+    def rango(self, cluster):
+        """Filas [f0, f1) y columnas [c0, c1) que cubre el cluster"""
+        cf, cc = cluster
+        f0, c0 = cf * self.tamano, cc * self.tamano
+        return f0, min(f0 + self.tamano, self.grid.filas), c0, min(c0 + self.tamano, self.grid.columnas)
+
+    def _vecinos_cluster(self, cluster):
+        cf, cc = cluster
+        for df in (-1, 0, 1):
+            for dc in (-1, 0, 1):
+                if (df or dc) and 0 <= cf + df < self.clusters_filas \
+                        and 0 <= cc + dc < self.clusters_columnas:
+                    yield cf + df, cc + dc
+
+    # --- Construcción incremental ----------------------------------------
+
+    def _celda_cambiada(self, pos, pared):
+        fila, col = pos
+        # Una celda de borde afecta también a los clusters del otro lado
+        for df in (-1, 0, 1):
+            for dc in (-1, 0, 1):
+                f, c = fila + df, col + dc
+                if self.grid.dentro((f, c)):
+                    self.sucios.add((f // self.tamano, c // self.tamano))
+
+    def actualizar(self):
+        """Reconstruye los bordes y costos internos de los clusters marcados como sucios"""
+        if not self.sucios:
+            return
+        sucios, self.sucios = self.sucios, set()
+
+        bordes = {tuple(sorted((cluster, vecino)))
+                  for cluster in sucios for vecino in self._vecinos_cluster(cluster)}
+        for borde in bordes:
+            for a, b, _ in self.transiciones.pop(borde, []):
+                self.entre[a].pop(b, None)
+                self.entre[b].pop(a, None)
+            self.transiciones[borde] = nuevas = self._calcular_transiciones(*borde)
+            for a, b, costo in nuevas:
+                self.entre.setdefault(a, {})[b] = costo
+                self.entre.setdefault(b, {})[a] = costo
+
+        afectados = {cluster for borde in bordes for cluster in borde}
+        for cluster in afectados:
+            nodos = set()
+            for vecino in self._vecinos_cluster(cluster):
+                for a, b, _ in self.transiciones.get(tuple(sorted((cluster, vecino))), []):
+                    nodos.add(a if self.cluster_de(a) == cluster else b)
+            if cluster in sucios or nodos != self.nodos.get(cluster):
+                self.nodos[cluster] = nodos
+                self.dentro[cluster] = self._costos_locales(cluster, nodos)
+
+    def _calcular_transiciones(self, k1, k2):
+        """Transiciones (a, b, costo) entre dos clusters vecinos, con k1 < k2"""
+        f0, f1, c0, c1 = self.rango(k1)
+        columnas = self.grid.columnas
+        if k2[0] == k1[0]:
+            # Vecino a la derecha: borde vertical entre las columnas c1 - 1 y c1
+            lado_a = [f * columnas + c1 - 1 for f in range(f0, f1)]
+            lado_b = [f * columnas + c1 for f in range(f0, f1)]
+        elif k2[1] == k1[1]:
+            # Vecino de abajo: borde horizontal entre las filas f1 - 1 y f1
+            lado_a = [(f1 - 1) * columnas + c for c in range(c0, c1)]
+            lado_b = [f1 * columnas + c for c in range(c0, c1)]
+        elif k2[1] > k1[1]:
+            # Vecino diagonal abajo-derecha: solo se tocan por la esquina
+            return self._cruces_esquina((f1 - 1) * columnas + c1 - 1, f1 * columnas + c1)
+        else:
+            # Vecino diagonal abajo-izquierda
+            return self._cruces_esquina((f1 - 1) * columnas + c0, f1 * columnas + c0 - 1)
+        return self._entradas(lado_a, lado_b)
+
+    def _cruces_esquina(self, a, b):
+        libre = self._libre
+        if libre[a] == LIBRE and libre[b] == LIBRE:
+            return [(a, b, COSTO_DIAGONAL)]
+        return []
+
+    def _entradas(self, lado_a, lado_b):
+        """Elige transiciones a lo largo de un borde recto.
+
+        Cada tramo de cruces rectos (celdas libres enfrentadas) recibe una
+        transición al centro, o dos en los extremos si es largo. Un cruce
+        diagonal solo se agrega si ninguna de sus dos columnas tiene cruce
+        recto; en ese caso sería la única forma de pasar por ahí.
+        """
+        libre = self._libre
+        recto = [libre[a] == LIBRE and libre[b] == LIBRE for a, b in zip(lado_a, lado_b)]
+        transiciones = []
+        i, n = 0, len(recto)
+        while i < n:
+            if not recto[i]:
+                i += 1
+                continue
+            j = i
+            while j + 1 < n and recto[j + 1]:
+                j += 1
+            if j - i + 1 >= LARGO_ENTRADA_DOBLE:
+                elegidas = (i, j)
+            else:
+                elegidas = ((i + j) // 2,)
+            for k in elegidas:
+                transiciones.append((lado_a[k], lado_b[k], COSTO_ORTOGONAL))
+            i = j + 1
+        for k in range(n - 1):
+            if recto[k] or recto[k + 1]:
+                continue
+            for a, b in ((lado_a[k], lado_b[k + 1]), (lado_a[k + 1], lado_b[k])):
+                if libre[a] == LIBRE and libre[b] == LIBRE:
+                    transiciones.append((a, b, COSTO_DIAGONAL))
+        return transiciones
+
+    # --- Búsquedas locales dentro de un cluster ----------------------------
+
+    def _grafo_local(self, cluster):
+        """Vecinos libres de cada celda libre del cluster, sin salir de él"""
+        f0, f1, c0, c1 = self.rango(cluster)
+        libre = self._libre
+        columnas = self.grid.columnas
+        desplazamientos = self.grid.desplazamientos
+        adyacencia = {}
+        for fila in range(f0, f1):
+            for col in range(c0, c1):
+                celda = fila * columnas + col
+                if libre[celda] != LIBRE:
+                    continue
+                adyacencia[celda] = [
+                    (celda + delta, costo) for dx, dy, delta, costo in desplazamientos
+                    if f0 <= fila + dx < f1 and c0 <= col + dy < c1
+                    and libre[celda + delta] == LIBRE
+                ]
+        return adyacencia
+
+    def _dijkstra_local(self, origen, adyacencia, destinos, detener=False):
+        """Dijkstra sobre el grafo de un cluster. Devuelve (costos a destinos, padres)"""
+        costos = {origen: 0}
+        padres = {}
+        encontrados = {}
+        pendientes = len(destinos)
+        heap = [(0, origen)]
+        while heap and pendientes:
+            g, celda = heappop(heap)
+            if g > costos[celda]:
+                continue
+            if celda in destinos and celda not in encontrados:
+                encontrados[celda] = g
+                pendientes -= 1
+                if detener:
+                    break
+            for vecino, costo in adyacencia[celda]:
+                nuevo = g + costo
+                if nuevo < costos.get(vecino, float("inf")):
+                    costos[vecino] = nuevo
+                    padres[vecino] = celda
+                    heappush(heap, (nuevo, vecino))
+        return encontrados, padres
+
+    def _costos_locales(self, cluster, nodos):
+        """Costo entre cada par de entradas del cluster (simétrico: un Dijkstra por par pendiente)"""
+        adyacencia = self._grafo_local(cluster)
+        costos = {nodo: {} for nodo in nodos}
+        pendientes = set(nodos)
+        for nodo in nodos:
+            pendientes.discard(nodo)
+            if not pendientes:
+                break
+            encontrados, _ = self._dijkstra_local(nodo, adyacencia, pendientes)
+            for otro, costo in encontrados.items():
+                costos[nodo][otro] = costo
+                costos[otro][nodo] = costo
+        return costos
+
+    def _refinar(self, a, b):
+        """Camino de celdas de a hasta b (sin incluir a)"""
+        if b in self.entre.get(a, ()) and self.cluster_de(a) != self.cluster_de(b):
+            return [b]
+        adyacencia = self._grafo_local(self.cluster_de(a))
+        _, padres = self._dijkstra_local(a, adyacencia, {b}, detener=True)
+        tramo = [b]
+        while tramo[-1] != a:
+            tramo.append(padres[tramo[-1]])
+        tramo.pop()
+        tramo.reverse()
+        return tramo
+
+    # --- Consulta -----------------------------------------------------------
+
+    def buscar(self, inicio, objetivo, refinar=True):
+        """Camino casi óptimo entre dos posiciones usando el grafo abstracto.
+
+        Con `refinar=False` el camino solo contiene los puntos de paso del
+        grafo abstracto; `costo` es el mismo en ambos casos.
+        """
+        t0 = time.perf_counter()
+        # Los costos de terreno pueden haber cambiado después de construir el mapa
+        if not self.grid.uniforme:
+            raise ValueError("MapaJerarquico requiere costos de terreno uniformes; usa modo='a_star'")
+        rechazo = rechazo_inmediato(self.grid, inicio, objetivo, None, t0)
+        if rechazo is not None:
+            return rechazo
+        self.actualizar()
+
+        grid = self.grid
+        origen, destino = grid.indice(inicio), grid.indice(objetivo)
+        cluster_origen, cluster_destino = self.cluster_de(origen), self.cluster_de(destino)
+
+        # Aristas temporales del inicio y del objetivo hacia las entradas de sus clusters
+        nodos_origen = set(self.nodos.get(cluster_origen, ()))
+        if cluster_origen == cluster_destino:
+            nodos_origen.add(destino)
+        desde_origen, _ = self._dijkstra_local(origen, self._grafo_local(cluster_origen),
+                                               nodos_origen)
+        hacia_destino, _ = self._dijkstra_local(destino, self._grafo_local(cluster_destino),
+                                                set(self.nodos.get(cluster_destino, ())))
+
+        def vecinos(nodo):
+            cluster = self.cluster_de(nodo)
+            yield from self.dentro.get(cluster, {}).get(nodo, {}).items()
+            yield from self.entre.get(nodo, {}).items()
+            if nodo == origen:
+                yield from desde_origen.items()
+            if nodo in hacia_destino:
+                yield destino, hacia_destino[nodo]
+
+        costos = {origen: 0}
+        padres = {}
+        heap = [(octil(inicio, objetivo), 0, origen)]
+        expandidos = abiertos = 0
+        while heap:
+            _, g, nodo = heappop(heap)
+            if g > costos[nodo]:
+                continue  # Entrada vieja de un nodo que ya mejoró
+            expandidos += 1
+            if nodo == destino:
+                break
+            for vecino, costo in vecinos(nodo):
+                nuevo = g + costo
+                if nuevo < costos.get(vecino, float("inf")) - TOLERANCIA:
+                    costos[vecino] = nuevo
+                    padres[vecino] = nodo
+                    heappush(heap, (nuevo + octil(grid.posicion(vecino), objetivo), nuevo, vecino))
+                    abiertos += 1
+        else:
+            return Resultado([], float("inf"), expandidos, abiertos, time.perf_counter() - t0)
+
+        puntos = [destino]
+        while puntos[-1] != origen:
+            puntos.append(padres[puntos[-1]])
+        puntos.reverse()
+
+        if refinar:
+            celdas = [origen]
+            for a, b in zip(puntos, puntos[1:]):
+                celdas.extend(self._refinar(a, b))
+            camino = [grid.posicion(celda) for celda in celdas]
+            costo = costo_camino(camino)
+        else:
+            camino = [grid.posicion(punto) for punto in puntos]
+            costo = costos[destino]
+        return Resultado(camino, costo, expandidos, abiertos, time.perf_counter() - t0)
@@ -0,0 +1,177 @@
+"""Jump Point Search (JPS) sobre el mismo `Grid` que usa A*.
+
+En mapas de costo uniforme muchos caminos óptimos son simétricos: JPS poda
+los vecinos que otro camino igual de corto ya cubre y "salta" en línea recta
+o diagonal hasta encontrar un punto con vecinos forzados por una pared. Solo
+esos puntos de salto entran a la cola, así que en mapas abiertos se hacen
+muchas menos operaciones de heap que con A*. Las reglas de poda corresponden
+a la misma regla de movimiento del grid: una diagonal es válida si la celda
+destino está libre, aunque corte una esquina.
+"""
+import time
+
+from busqueda import (TOLERANCIA, ConjuntoAbierto, Resultado, costo_camino, reconstruir_camino,
+                      rechazo_inmediato)
+from grid import LIBRE
+from heuristicas import obtener_heuristica, octil
+
+
+def _signo(valor):
+    return (valor > 0) - (valor < 0)
+
+
+def jps(grid, inicio, objetivo, observador=None, heuristica="octil"):
+    """Busca el camino de menor costo con Jump Point Search.
+
+    Recibe los mismos argumentos que `busqueda.a_star` y devuelve un
+    `Resultado` con el camino completo celda por celda; `expandidos` y
+    `abiertos` cuentan solo puntos de salto. Solo admite grids sin costos de
+    terreno: la poda de simetrías supone que todos los pasos rectos cuestan igual.
+    """
+    t0 = time.perf_counter()
+    heuristica = obtener_heuristica(heuristica)
+    if not grid.uniforme:
+        raise ValueError("JPS requiere costos de terreno uniformes; usa modo='a_star'")
+    rechazo = rechazo_inmediato(grid, inicio, objetivo, observador, t0)
+    if rechazo is not None:
+        return rechazo
+    g_score = memoryview(grid.g)
+    came_from = memoryview(grid.padre)
+    ocupacion = memoryview(grid.ocupacion.reshape(-1))
+    filas, columnas = grid.filas, grid.columnas
+    fila_objetivo, col_objetivo = objetivo
+
+    def libre(fila, col):
+        return (0 <= fila < filas and 0 <= col < columnas
+                and ocupacion[fila * columnas + col] == LIBRE)
+
+    def saltar(fila, col, dx, dy):
+        """Avanza en (dx, dy) y devuelve el siguiente punto de salto o None"""
+        while True:
+            fila += dx
+            col += dy
+            if not libre(fila, col):
+                return None
+            if fila == fila_objetivo and col == col_objetivo:
+                return fila, col
+            if dx and dy:
+                if ((not libre(fila - dx, col) and libre(fila - dx, col + dy))
+                        or (not libre(fila, col - dy) and libre(fila + dx, col - dy))):
+                    return fila, col
+                # Un punto diagonal es de salto si alguna de sus rectas lo es
+                if saltar(fila, col, dx, 0) is not None or saltar(fila, col, 0, dy) is not None:
+                    return fila, col
+            elif dx:
+                if ((not libre(fila, col + 1) and libre(fila + dx, col + 1))
+                        or (not libre(fila, col - 1) and libre(fila + dx, col - 1))):
+                    return fila, col
+            else:
+                if ((not libre(fila + 1, col) and libre(fila + 1, col + dy))
+                        or (not libre(fila - 1, col) and libre(fila - 1, col + dy))):
+                    return fila, col
+
+    def direcciones_podadas(fila, col, dx, dy):
+        """Direcciones naturales y forzadas al llegar a (fila, col) moviéndose en (dx, dy)"""
+        if dx and dy:
+            if libre(fila + dx, col):
+                yield dx, 0
+            if libre(fila, col + dy):
+                yield 0, dy
+            if libre(fila + dx, col + dy):
+                yield dx, dy
+            if not libre(fila - dx, col) and libre(fila - dx, col + dy):
+                yield -dx, dy
+            if not libre(fila, col - dy) and libre(fila + dx, col - dy):
+                yield dx, -dy
+        elif dx:
+            if libre(fila + dx, col):
+                yield dx, 0
+            if not libre(fila, col + 1) and libre(fila + dx, col + 1):
+                yield dx, 1
+            if not libre(fila, col - 1) and libre(fila + dx, col - 1):
+                yield dx, -1
+        else:
+            if libre(fila, col + dy):
+                yield 0, dy
+            if not libre(fila + 1, col) and libre(fila + 1, col + dy):
+                yield 1, dy
+            if not libre(fila - 1, col) and libre(fila - 1, col + dy):
+                yield -1, dy
+
+    nodo_inicio = grid.indice(inicio)
+    nodo_objetivo = grid.indice(objetivo)
+
+    open_set = ConjuntoAbierto()
+    g_score[nodo_inicio] = 0
+    open_set.agregar(nodo_inicio, 0, heuristica(inicio, objetivo))
+    tocados = [nodo_inicio]
+
+    expandidos = 0
+    camino = []
+
+    try:
+        while True:
+            entrada = open_set.extraer(g_score)
+            if entrada is None:
+                break
+            current, g_current = entrada
+            expandidos += 1
+
+            if current == nodo_objetivo:
+                camino = _interpolar(reconstruir_camino(grid, current))
+                break
+
+            fila, col = grid.posicion(current)
+            padre = came_from[current]
+            if padre < 0:
+                # El inicio no tiene dirección de llegada: se prueban las 8
+                direcciones = [grid.posicion(vecino) for vecino, _ in grid.vecinos(current)]
+                direcciones = [(f - fila, c - col) for f, c in direcciones]
+            else:
+                fila_padre, col_padre = grid.posicion(padre)
+                direcciones = direcciones_podadas(fila, col, _signo(fila - fila_padre),
+                                                  _signo(col - col_padre))
+
+            for dx, dy in direcciones:
+                punto = saltar(fila, col, dx, dy)
+                if punto is None:
+                    continue
+                vecino = grid.indice(punto)
+                # El tramo es recto o diagonal puro, así que su costo es octil
+                tentative_g_score = g_current + octil((fila, col), punto)
+
+                if tentative_g_score < g_score[vecino] - TOLERANCIA:
+                    if came_from[vecino] < 0 and vecino != nodo_inicio:
+                        tocados.append(vecino)
+                    came_from[vecino] = current
+                    g_score[vecino] = tentative_g_score
+                    open_set.agregar(vecino, g_score[vecino], heuristica(punto, objetivo))
+                    if observador is not None:
+                        observador.nodo_abierto(punto)
+
+            if observador is not None:
+                observador.nodo_cerrado((fila, col))
+    finally:
+        grid.limpiar(tocados)
+
+    costo = costo_camino(camino) if camino else float("inf")
+    resultado = Resultado(camino, costo, expandidos, open_set.inserciones,
+                          time.perf_counter() - t0, cota=1)
+    if observador is not None:
+        observador.terminado(resultado)
+    return resultado
+
+
+def _interpolar(puntos):
+    """Convierte la lista de puntos de salto en el camino celda por celda"""
+    if not puntos:
+        return []
+    camino = [puntos[0]]
+    for (fila2, col2) in puntos[1:]:
+        fila, col = camino[-1]
+        dx, dy = _signo(fila2 - fila), _signo(col2 - col)
+        while (fila, col) != (fila2, col2):
+            fila += dx
+            col += dy
+            camino.append((fila, col))
+    return camino
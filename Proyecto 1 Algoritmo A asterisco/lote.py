@@ -0,0 +1,152 @@
+"""Resolución de muchas consultas (inicio, objetivo) sobre un mismo mapa.
+
+`PlanificadorLote` prepara una sola vez lo que comparten todas las consultas:
+las etiquetas de componentes conexas (para rechazar al instante los pares sin
+camino) y un pool de procesos. El grid (costos de terreno y ocupación) se
+copia una vez a memoria compartida y cada proceso arma su propio `Grid` sobre
+ese bloque, así que en cada tarea solo viajan los pares de posiciones y no el
+mapa.
+"""
+import os
+import sys
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+
+from busqueda import Resultado, buscar
+from componentes import Componentes
+from grid import Grid
+
+# Estado de cada proceso del pool, creado por _iniciar_proceso
+_memoria = None
+_grid = None
+
+
+def _abrir_memoria(nombre):
+    if sys.version_info >= (3, 13):
+        # El proceso principal es el dueño del bloque; los hijos no lo liberan
+        return shared_memory.SharedMemory(name=nombre, track=False)
+    return shared_memory.SharedMemory(name=nombre)
+
+
+def _vistas_compartidas(memoria, forma):
+    """Costos (float32) al principio del bloque y ocupación (uint8) a continuación"""
+    costos = np.ndarray(forma, dtype=np.float32, buffer=memoria.buf)
+    ocupacion = np.ndarray(forma, dtype=np.uint8, buffer=memoria.buf, offset=costos.nbytes)
+    return costos, ocupacion
+
+
+def _iniciar_proceso(nombre, forma):
+    global _memoria, _grid
+    _memoria = _abrir_memoria(nombre)
+    costos, ocupacion = _vistas_compartidas(_memoria, forma)
+    _grid = Grid(*forma, ocupacion=ocupacion, costos=costos)
+
+
+def _resolver_bloque(tarea):
+    pares, modo, heuristica = tarea
+    return [buscar(_grid, (fila_i, col_i), (fila_o, col_o), modo=modo, heuristica=heuristica)
+            for fila_i, col_i, fila_o, col_o in pares]
+
+
+def _normalizar_pares(pares):
+    """Acepta [((fi, ci), (fo, co)), ...] o un arreglo (k, 4) y devuelve un arreglo (k, 4)"""
+    return np.asarray(pares, dtype=np.int64).reshape(-1, 4)
+
+
+class PlanificadorLote:
+    """Resuelve lotes de consultas sobre un mapa estático con un pool de procesos.
+
+    Con `procesos=1` todo se resuelve en el proceso actual, sin pool ni
+    memoria compartida. Si el mapa cambia hay que llamar a `actualizar_mapa`.
+    """
+
+    def __init__(self, grid, procesos=None, modo="a_star", heuristica="octil"):
+        self.grid = grid
+        self.procesos = procesos or os.cpu_count() or 1
+        self.modo = modo
+        self.heuristica = heuristica
+        self.rechazados = 0  # Consultas descartadas por estar en componentes distintas
+        self._memoria = None
+        self._pool = None
+        # Se reutilizan las componentes del grid si ya se mantienen al día
+        self.componentes = grid.componentes or Componentes(grid)
+
+        if self.procesos > 1:
+            forma = grid.ocupacion.shape
+            tamano = grid.costos.nbytes + grid.ocupacion.nbytes
+            self._memoria = shared_memory.SharedMemory(create=True, size=tamano)
+            self._costos, self._compartida = _vistas_compartidas(self._memoria, forma)
+            self._costos[:] = grid.costos
+            self._compartida[:] = grid.ocupacion
+            self._pool = Pool(self.procesos, initializer=_iniciar_proceso,
+                              initargs=(self._memoria.name, forma))
+
+    def actualizar_mapa(self):
+        """Copia a la memoria compartida los cambios hechos al grid.
+
+        Las componentes se actualizan solas con cada edición; solo los
+        procesos del pool necesitan ver la ocupación y los costos nuevos.
+        """
+        if self._memoria is not None:
+            self._costos[:] = self.grid.costos
+            self._compartida[:] = self.grid.ocupacion
+
+    def resolver(self, pares, tamano_bloque=None):
+        """Devuelve un `Resultado` por cada par (inicio, objetivo), en el mismo orden"""
+        pares = _normalizar_pares(pares)
+        resultados = [None] * len(pares)
+
+        # Rechazo inmediato de pares en componentes distintas o sobre paredes
+        etiquetas = self.componentes.etiquetas
+        etiqueta_inicio = etiquetas[pares[:, 0], pares[:, 1]]
+        etiqueta_objetivo = etiquetas[pares[:, 2], pares[:, 3]]
+        alcanzables = (etiqueta_inicio != 0) & (etiqueta_inicio == etiqueta_objetivo)
+        for i in np.flatnonzero(~alcanzables).tolist():
+            resultados[i] = Resultado([], float("inf"), 0, 0, 0.0)
+        self.rechazados += int(len(pares) - alcanzables.sum())
+
+        pendientes = np.flatnonzero(alcanzables)
+        if len(pendientes) == 0:
+            return resultados
+
+        if self._pool is None:
+            for i in pendientes.tolist():
+                fila_i, col_i, fila_o, col_o = pares[i].tolist()
+                resultados[i] = buscar(self.grid, (fila_i, col_i), (fila_o, col_o),
+                                       modo=self.modo, heuristica=self.heuristica)
+            return resultados
+
+        if tamano_bloque is None:
+            # Unos cuatro bloques por proceso para repartir bien la carga
+            tamano_bloque = max(1, -(-len(pendientes) // (self.procesos * 4)))
+        bloques = [pendientes[i:i + tamano_bloque]
+                   for i in range(0, len(pendientes), tamano_bloque)]
+        tareas = [(pares[bloque].tolist(), self.modo, self.heuristica) for bloque in bloques]
+        for bloque, parciales in zip(bloques, self._pool.imap(_resolver_bloque, tareas)):
+            for i, resultado in zip(bloque.tolist(), parciales):
+                resultados[i] = resultado
+        return resultados
+
+    def cerrar(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        if self._memoria is not None:
+            del self._costos, self._compartida
+            self._memoria.close()
+            self._memoria.unlink()
+            self._memoria = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+
+def buscar_lote(grid, pares, procesos=None, modo="a_star", heuristica="octil"):
+    """Atajo para resolver un único lote; para varios lotes conviene reutilizar un PlanificadorLote"""
+    with PlanificadorLote(grid, procesos, modo, heuristica) as planificador:
+        return planificador.resolver(pares)
@@ -0,0 +1,196 @@
+"""Mapas reproducibles para probar y medir las búsquedas.
+
+Incluye lectura y escritura del formato de MovingAI (`.map` con el mapa y
+`.scen` con consultas) y generadores con `semilla` de obstáculos aleatorios,
+laberintos y habitaciones. Todo trabaja con matrices uint8 de ocupación
+(0 libre, 1 pared) que se convierten con `Grid.desde_arreglo`.
+
+Los escenarios de MovingAI traen la longitud óptima con diagonales de √2 y
+sin cortar esquinas; en este grid las diagonales cuestan 1.4 y pueden cortar
+esquinas, así que esa longitud solo sirve como referencia.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from componentes import etiquetar_componentes
+from grid import LIBRE, PARED, Grid
+
+# Caracteres transitables del formato .map (el resto son obstáculos: @ O T W)
+TRANSITABLES_MOVINGAI = ".GS"
+
+# Consulta de un archivo .scen; inicio y objetivo son (fila, col)
+Escenario = namedtuple("Escenario", "cubeta mapa inicio objetivo longitud_optima")
+
+
+# --- Formato MovingAI ------------------------------------------------------
+
+def cargar_mapa(ruta):
+    """Lee un archivo .map de MovingAI y devuelve la matriz de ocupación"""
+    with open(ruta, encoding="ascii") as archivo:
+        encabezado = {}
+        for linea in archivo:
+            linea = linea.strip()
+            if linea == "map":
+                break
+            clave, _, valor = linea.partition(" ")
+            encabezado[clave] = valor
+        else:
+            raise ValueError(f"{ruta}: falta la línea 'map' del encabezado")
+        filas, columnas = int(encabezado["height"]), int(encabezado["width"])
+        lineas = [linea.rstrip("\r\n") for linea in archivo][:filas]
+
+    if len(lineas) != filas or any(len(linea) < columnas for linea in lineas):
+        raise ValueError(f"{ruta}: el mapa no mide {filas}x{columnas}")
+    caracteres = np.array([list(linea[:columnas]) for linea in lineas])
+    return np.where(np.isin(caracteres, list(TRANSITABLES_MOVINGAI)), LIBRE, PARED).astype(np.uint8)
+
+
+def guardar_mapa(ruta, ocupacion):
+    """Escribe la matriz de ocupación como archivo .map de MovingAI"""
+    filas, columnas = ocupacion.shape
+    with open(ruta, "w", encoding="ascii", newline="\n") as archivo:
+        archivo.write(f"type octile\nheight {filas}\nwidth {columnas}\nmap\n")
+        for fila in ocupacion:
+            archivo.write("".join("@" if celda else "." for celda in fila.tolist()) + "\n")
+
+
+def cargar_escenarios(ruta):
+    """Lee un archivo .scen de MovingAI y devuelve una lista de `Escenario`"""
+    escenarios = []
+    with open(ruta, encoding="ascii") as archivo:
+        for linea in archivo:
+            campos = linea.split()
+            if not campos or campos[0] == "version":
+                continue
+            # cubeta, mapa, ancho, alto, x inicio, y inicio, x objetivo, y objetivo, óptimo
+            x0, y0, x1, y1 = (int(campo) for campo in campos[4:8])
+            escenarios.append(Escenario(int(campos[0]), campos[1], (y0, x0), (y1, x1),
+                                        float(campos[8])))
+    return escenarios
+
+
+def guardar_escenarios(ruta, escenarios, forma):
+    """Escribe escenarios como archivo .scen de MovingAI (`forma` es (filas, columnas))"""
+    filas, columnas = forma
+    with open(ruta, "w", encoding="ascii", newline="\n") as archivo:
+        archivo.write("version 1\n")
+        for esc in escenarios:
+            (y0, x0), (y1, x1) = esc.inicio, esc.objetivo
+            archivo.write(f"{esc.cubeta}\t{esc.mapa}\t{columnas}\t{filas}\t"
+                          f"{x0}\t{y0}\t{x1}\t{y1}\t{esc.longitud_optima:.8f}\n")
+
+
+def generar_escenarios(ocupacion, cantidad, semilla=None, nombre_mapa=""):
+    """Pares aleatorios de celdas libres conectadas entre sí.
+
+    La longitud óptima queda en 0: se calcula al medir, con las reglas de
+    movimiento de este grid.
+    """
+    rng = np.random.default_rng(semilla)
+    etiquetas, _ = etiquetar_componentes(Grid.desde_arreglo(ocupacion))
+    libres = np.flatnonzero(etiquetas)
+    if len(libres) < 2:
+        return []
+    columnas = ocupacion.shape[1]
+    escenarios = []
+    # Se sortean candidatos de más por si caen en componentes distintas
+    while len(escenarios) < cantidad:
+        origenes = rng.choice(libres, cantidad)
+        destinos = rng.choice(libres, cantidad)
+        validos = etiquetas.flat[origenes] == etiquetas.flat[destinos]
+        for origen, destino in zip(origenes[validos].tolist(), destinos[validos].tolist()):
+            if len(escenarios) == cantidad:
+                break
+            escenarios.append(Escenario(0, nombre_mapa, divmod(origen, columnas),
+                                        divmod(destino, columnas), 0.0))
+    return escenarios
+
+
+# --- Generadores -----------------------------------------------------------
+
+def generar_obstaculos(filas, columnas=None, densidad=0.25, semilla=None):
+    """Paredes sueltas: cada celda es pared con probabilidad `densidad`"""
+    if columnas is None:
+        columnas = filas
+    rng = np.random.default_rng(semilla)
+    return (rng.random((filas, columnas)) < densidad).astype(np.uint8)
+
+
+def generar_laberinto(filas, columnas=None, semilla=None, apertura=0.0):
+    """Laberinto con pasillos de una celda.
+
+    Se genera con backtracking iterativo sobre las celdas de coordenadas
+    impares; las dimensiones pares se recortan a la impar anterior y el
+    borde sobrante queda como pared. Con `apertura=0` es un laberinto
+    perfecto (un solo camino entre dos celdas); con `apertura` > 0 se abre
+    esa fracción de las paredes internas restantes y aparecen ciclos.
+    """
+    if columnas is None:
+        columnas = filas
+    rng = np.random.default_rng(semilla)
+    ocupacion = np.full((filas, columnas), PARED, dtype=np.uint8)
+    celdas_filas, celdas_columnas = (filas - 1) // 2, (columnas - 1) // 2
+    if celdas_filas < 1 or celdas_columnas < 1:
+        return ocupacion
+
+    visitadas = np.zeros((celdas_filas, celdas_columnas), dtype=bool)
+    pasos = ((-1, 0), (1, 0), (0, -1), (0, 1))
+    pila = [(0, 0)]
+    visitadas[0, 0] = True
+    ocupacion[1, 1] = LIBRE
+    while pila:
+        fila, col = pila[-1]
+        opciones = [(fila + df, col + dc) for df, dc in pasos
+                    if 0 <= fila + df < celdas_filas and 0 <= col + dc < celdas_columnas
+                    and not visitadas[fila + df, col + dc]]
+        if not opciones:
+            pila.pop()
+            continue
+        siguiente = opciones[rng.integers(len(opciones))]
+        visitadas[siguiente] = True
+        # Se abren la celda nueva y la pared entre ambas
+        ocupacion[2 * siguiente[0] + 1, 2 * siguiente[1] + 1] = LIBRE
+        ocupacion[fila + siguiente[0] + 1, col + siguiente[1] + 1] = LIBRE
+        pila.append(siguiente)
+
+    if apertura > 0:
+        # Paredes entre dos celdas: una coordenada impar y la otra par, sin tocar el borde
+        interior = ocupacion[1:-1, 1:-1]
+        fila, col = np.indices(interior.shape)
+        entre_celdas = ((fila % 2) != (col % 2)) & (interior == PARED)
+        interior[entre_celdas & (rng.random(interior.shape) < apertura)] = LIBRE
+    return ocupacion
+
+
+def generar_habitaciones(filas, columnas=None, tamano=16, semilla=None, puertas=1):
+    """Habitaciones de `tamano` x `tamano` separadas por paredes de una celda.
+
+    Cada pared entre dos habitaciones vecinas tiene `puertas` aberturas de
+    una celda en posiciones aleatorias, así que todas quedan conectadas.
+    """
+    if columnas is None:
+        columnas = filas
+    rng = np.random.default_rng(semilla)
+    ocupacion = np.zeros((filas, columnas), dtype=np.uint8)
+    paso = tamano + 1
+    ocupacion[paso - 1::paso, :] = PARED
+    ocupacion[:, paso - 1::paso] = PARED
+    for fila_pared in range(paso - 1, filas, paso):
+        for c0 in range(0, columnas, paso):
+            tramo = min(tamano, columnas - c0)
+            for col in (c0 + rng.choice(tramo, min(puertas, tramo), replace=False)).tolist():
+                ocupacion[fila_pared, col] = LIBRE
+    for col_pared in range(paso - 1, columnas, paso):
+        for f0 in range(0, filas, paso):
+            tramo = min(tamano, filas - f0)
+            for fila in (f0 + rng.choice(tramo, min(puertas, tramo), replace=False)).tolist():
+                ocupacion[fila, col_pared] = LIBRE
+    return ocupacion
+
+
+GENERADORES = {
+    "obstaculos": generar_obstaculos,
+    "laberinto": generar_laberinto,
+    "habitaciones": generar_habitaciones,
+}
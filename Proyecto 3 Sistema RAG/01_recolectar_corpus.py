@@ -1,9 +1,13 @@
 import os
+import hashlib
+import argparse
 import requests
 from bs4 import BeautifulSoup
-import pdfplumber
 import time
 
+from extraccion_pdf import descargar_a_temporal, extraer_paginas
+from rastreador import CacheHTTP, Rastreador, cargar_fuentes
+
 if not os.path.exists("corpus"):
     os.makedirs("corpus")
 
@@ -11,53 +15,89 @@ headers = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
 }
 
-def descargar_texto_url(url, nombre_archivo):
-    """Descarga texto de una página web y lo guarda como .txt"""
+# ETag, Last-Modified y hash de cada URL ya descargada (ver rastreador.CacheHTTP)
+CACHE_HTTP = "corpus/cache_http.json"
+
+def _sin_cambios(rastreador, url, ruta, response, digest=None):
+    """True si la fuente no cambió desde la última descarga y su .txt sigue en corpus/.
+
+    Un 304 responde sin cuerpo; si el servidor no admite peticiones
+    condicionales se compara el hash del contenido con el guardado.
+    """
+    if rastreador is None or rastreador.cache is None or not os.path.exists(ruta):
+        return False
+    if response.status_code == 304:
+        return True
+    if digest is not None and rastreador.cache.mismo_contenido(url, digest):
+        rastreador.cache.actualizar(url, response, digest)  # Puede traer un ETag nuevo
+        return True
+    return False
+
+def descargar_texto_url(url, nombre_archivo, rastreador=None):
+    """Descarga texto de una página web y lo guarda como .txt
+
+    Con un `rastreador` (ver rastreador.py) se usa su sesión compartida, con
+    límite por host y reintentos.
+    """
     try:
         print(f"🌐 Descargando: {nombre_archivo}...")
-        response = requests.get(url, headers=headers, timeout=10)
+        ruta = f"corpus/{nombre_archivo}.txt"
+        if rastreador is not None:
+            response = rastreador.descargar(url, condicional=os.path.exists(ruta))
+        else:
+            response = requests.get(url, headers=headers, timeout=10)
+        digest = hashlib.sha256(response.content).hexdigest()
+        if _sin_cambios(rastreador, url, ruta, response, digest):
+            print(f"⏭️ Sin cambios: {ruta}")
+            return True
         soup = BeautifulSoup(response.content, 'html.parser')
         
         texto = soup.get_text(separator='\n', strip=True)
         
         # Guardar
-        ruta = f"corpus/{nombre_archivo}.txt"
         with open(ruta, "w", encoding="utf-8") as f:
             f.write(texto)
         print(f"✅ Texto guardado: {ruta}")
+        if rastreador is not None and rastreador.cache is not None:
+            rastreador.cache.actualizar(url, response, digest)
         return True
     except Exception as e:
         print(f"❌ Error descargando {nombre_archivo}: {e}")
         return False
 
-def descargar_pdf(url, nombre_archivo):
-    """Descarga un PDF y extrae su texto"""
+def descargar_pdf(url, nombre_archivo, rastreador=None, workers=None):
+    """Descarga un PDF y extrae su texto (por rangos de páginas en paralelo, ver extraccion_pdf.py)"""
     try:
         print(f"📥 Descargando PDF: {nombre_archivo}...")
-        response = requests.get(url, headers=headers, timeout=15, stream=True)
-        
-        pdf_path = f"corpus/temp_{nombre_archivo}.pdf"
-        with open(pdf_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+        txt_path = f"corpus/{nombre_archivo}.txt"
+        if rastreador is not None:
+            response = rastreador.descargar(url, condicional=os.path.exists(txt_path), stream=True)
+        else:
+            response = requests.get(url, headers=headers, timeout=15, stream=True)
+        if _sin_cambios(rastreador, url, txt_path, response):
+            response.close()
+            print(f"⏭️ Sin cambios: {txt_path}")
+            return True
         
-        # Extraer texto del PDF
-        texto_completo = ""
-        with pdfplumber.open(pdf_path) as pdf:
-            for pagina in pdf.pages:
-                texto_pagina = pagina.extract_text()
-                if texto_pagina:
-                    texto_completo += texto_pagina + "\n\n"
+        pdf_path, digest = descargar_a_temporal(response, "corpus")
+        try:
+            if _sin_cambios(rastreador, url, txt_path, response, digest):
+                print(f"⏭️ Sin cambios: {txt_path}")
+                return True
+            
+            # Extraer texto del PDF
+            paginas = extraer_paginas(pdf_path, "pdfplumber", workers)
+        finally:
+            os.remove(pdf_path)
+        texto_completo = "".join(texto + "\n\n" for texto in paginas if texto)
         
         # Guardar texto extraído
         if texto_completo.strip():
-            txt_path = f"corpus/{nombre_archivo}.txt"
             with open(txt_path, "w", encoding="utf-8") as f:
                 f.write(texto_completo)
             print(f"✅ PDF procesado y guardado como texto: {txt_path}")
-            
-            # Opcional: eliminar PDF temporal
-            os.remove(pdf_path)
+            if rastreador is not None and rastreador.cache is not None:
+                rastreador.cache.actualizar(url, response, digest)
             return True
         else:
             print(f"⚠️ PDF sin texto extraíble: {nombre_archivo}")
@@ -67,16 +107,13 @@ def descargar_pdf(url, nombre_archivo):
         print(f"❌ Error procesando PDF {nombre_archivo}: {e}")
         return False
 
-def extraer_texto_de_pdf_local(ruta_pdf, nombre_archivo):
+def extraer_texto_de_pdf_local(ruta_pdf, nombre_archivo, workers=None):
     """Extrae texto de un PDF ya descargado localmente"""
     try:
         print(f"📄 Extrayendo texto de PDF local: {ruta_pdf}...")
-        texto_completo = ""
-        with pdfplumber.open(ruta_pdf) as pdf:
-            for i, pagina in enumerate(pdf.pages):
-                texto_pagina = pagina.extract_text()
-                if texto_pagina:
-                    texto_completo += f"--- Página {i+1} ---\n{texto_pagina}\n\n"
+        paginas = extraer_paginas(ruta_pdf, "pdfplumber", workers)
+        texto_completo = "".join(f"--- Página {i+1} ---\n{texto}\n\n"
+                                 for i, texto in enumerate(paginas) if texto)
         
         if texto_completo.strip():
             txt_path = f"corpus/{nombre_archivo}.txt"
@@ -118,19 +155,56 @@ def descargar_ejemplos():
         # Agrega más URLs aquí...
     ]
     
-    for fuente in fuentes:
-        if fuente["tipo"] == "web":
-            descargar_texto_url(fuente["url"], fuente["nombre"])
-        elif fuente["tipo"] == "pdf":
-            descargar_pdf(fuente["url"], fuente["nombre"])
-        time.sleep(2)  # Pausa para no saturar servidores
+    recolectar_fuentes(fuentes)
+
+def _descargar_fuente(rastreador, fuente):
+    if fuente["tipo"] == "pdf":
+        # Corre en un hilo del rastreador: un pool de procesos por hilo puede
+        # trabarse al hacer fork, así que el PDF se extrae en este mismo hilo
+        return descargar_pdf(fuente["url"], fuente["nombre"], rastreador, workers=1)
+    return descargar_texto_url(fuente["url"], fuente["nombre"], rastreador)
+
+def recolectar_fuentes(fuentes, workers=4, intervalo=2.0, reintentos=3, forzar=False):
+    """Descarga las fuentes en paralelo, con una pausa de `intervalo` segundos por servidor.
+
+    Las fuentes ya descargadas se piden de forma condicional y no se vuelven
+    a extraer si no cambiaron; `forzar=True` descarga y extrae todo de nuevo.
+    Los PDFs se extraen con un solo proceso dentro de cada hilo de descarga.
+    """
+    inicio = time.perf_counter()
+    cache = CacheHTTP(CACHE_HTTP)
+    if forzar:
+        cache.entradas.clear()
+    with Rastreador(workers, intervalo, reintentos, cache=cache) as rastreador:
+        resultados = rastreador.rastrear(fuentes, _descargar_fuente)
+    print(f"\n📊 {sum(resultados)}/{len(fuentes)} fuentes descargadas "
+          f"en {time.perf_counter() - inicio:.1f} s")
+    return resultados
 
 # --- EJECUCIÓN PRINCIPAL ---
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recolecta textos web y PDF en corpus/")
+    parser.add_argument("--lista", help="archivo con una fuente por línea: 'url nombre [web|pdf]'")
+    parser.add_argument("--workers", type=int, default=4, help="descargas simultáneas")
+    parser.add_argument("--intervalo", type=float, default=2.0,
+                        help="segundos mínimos entre peticiones al mismo servidor")
+    parser.add_argument("--reintentos", type=int, default=3,
+                        help="reintentos ante errores de red o respuestas 429/5xx")
+    parser.add_argument("--forzar", action="store_true",
+                        help="ignora la caché HTTP y vuelve a descargar y extraer todo")
+    args = parser.parse_args()
+    
     print("="*60)
     print("🔍 RECOLECTOR DE CORPUS PARA PROYECTO RAG")
     print("="*60)
     
+    if args.lista:
+        fuentes = cargar_fuentes(args.lista)
+        print(f"\n📋 {len(fuentes)} fuentes en {args.lista} ({args.workers} descargas simultáneas)")
+        recolectar_fuentes(fuentes, args.workers, args.intervalo, args.reintentos, args.forzar)
+        print("\n🎯 Proceso completado. Revisa la carpeta 'corpus/'")
+        exit()
+    
     # Opción 1: Descargar ejemplos (reemplaza las URLs primero)
     # descargar_ejemplos()
     
@@ -145,12 +219,14 @@ if __name__ == "__main__":
     if opcion == "1":
         url = input("URL de la página web: ").strip()
         nombre = input("Nombre para guardar (sin extensión): ").strip()
-        descargar_texto_url(url, nombre)
+        with Rastreador(1, cache=CacheHTTP(CACHE_HTTP)) as rastreador:
+            descargar_texto_url(url, nombre, rastreador)
         
     elif opcion == "2":
         url = input("URL del PDF: ").strip()
         nombre = input("Nombre para guardar (sin extensión): ").strip()
-        descargar_pdf(url, nombre)
+        with Rastreador(1, cache=CacheHTTP(CACHE_HTTP)) as rastreador:
+            descargar_pdf(url, nombre, rastreador)
         
     elif opcion == "3":
         ruta = input("Ruta del PDF local (ej: C:/Users/.../documento.pdf): ").strip()
@@ -160,4 +236,4 @@ if __name__ == "__main__":
     else:
         print("❌ Opción no válida")
     
-    print("\n🎯 Proceso completado. Revisa la carpeta 'corpus/'")
\ No newline at end of file
+    print("\n🎯 Proceso completado. Revisa la carpeta 'corpus/'")
@@ -1,18 +1,44 @@
 import os
 import re
+import json
+import shutil
+import hashlib
+import argparse
+from multiprocessing import Pool
+
+from almacen_fragmentos import AlmacenFragmentos
+
+PALABRAS_POR_FRAGMENTO = 400
+ALMACEN = "corpus_procesado"
+TEMPORAL = "corpus_procesado/temporal"
+MANIFIESTO = "corpus_procesado/manifiesto.json"
+FORMATO_MANIFIESTO = 2
+# Archivo de versiones anteriores, reemplazado por el almacén
+CONSOLIDADO_ANTERIOR = "corpus_procesado/!todos_fragmentos.txt"
+
+# Patrones compilados una sola vez. Correos y caracteres especiales (excepto
+# puntuación básica) se eliminan en la misma pasada; las URLs van antes porque
+# una URL pegada a un correo se recorta distinto si se eliminan juntas.
+_RE_URLS = re.compile(r'https?://\S+|www\.\S+')
+_RE_CORREOS_Y_ESPECIALES = re.compile(r'\S+@\S+|[^\w\s.,;:¡!¿?áéíóúüñÁÉÍÓÚÜÑ\-]')
+_RE_PARRAFOS = re.compile(r'\n\s*\n')
+_RE_ESPACIOS = re.compile(r'[ \t]+')
 
 def limpiar_texto(texto):
     """Limpia el texto de caracteres no deseados"""
-    # Eliminar múltiples espacios y saltos
-    texto = re.sub(r'\n\s*\n', '\n\n', texto)  # Preservar párrafos
-    texto = re.sub(r'[ \t]+', ' ', texto)      # Espacios múltiples
-    # Eliminar URLs
-    texto = re.sub(r'https?://\S+|www\.\S+', '', texto)
-    # Eliminar correos
-    texto = re.sub(r'\S+@\S+', '', texto)
-    # Eliminar caracteres especiales excepto puntuación básica
-    texto = re.sub(r'[^\w\s.,;:¡!¿?áéíóúüñÁÉÍÓÚÜÑ\-]', '', texto)
-    return texto.strip()
+    # Primero los espacios y después lo que se elimina, en ese orden: lo que
+    # se borra puede dejar espacios dobles que se conservan
+    return _eliminar(_normalizar_espacios(texto)).strip()
+
+def _eliminar(texto):
+    """Elimina URLs, correos y caracteres especiales"""
+    return _RE_CORREOS_Y_ESPECIALES.sub('', _RE_URLS.sub('', texto))
+
+def _normalizar_espacios(texto):
+    """Elimina múltiples espacios y saltos"""
+    texto = _RE_PARRAFOS.sub('\n\n', texto)  # Preservar párrafos
+    texto = _RE_ESPACIOS.sub(' ', texto)     # Espacios múltiples
+    return texto
 
 def dividir_en_fragmentos(texto, palabras_por_fragmento=500):
     """Divide el texto en fragmentos de ~N palabras"""
@@ -26,8 +52,132 @@ def dividir_en_fragmentos(texto, palabras_por_fragmento=500):
         fragmentos.append(fragmento)
     return fragmentos
 
-def procesar_corpus():
-    """Procesa todos los textos de la carpeta corpus/"""
+def fragmentar_lineas(lineas, palabras_por_fragmento=500):
+    """Limpia y divide un texto que llega línea por línea.
+
+    Da los mismos fragmentos que limpiar_texto + dividir_en_fragmentos (sin
+    los vacíos), pero en memoria solo se guarda el fragmento en curso. Las
+    palabras no dependen de los espacios, así que cada línea se limpia por
+    separado; un texto que cabe en un único fragmento se limpia entero al
+    final con limpiar_texto porque conserva sus espacios y párrafos.
+    """
+    palabras = []
+    lineas_iniciales = []  # Solo mientras el texto quepa en un único fragmento
+    for linea in lineas:
+        palabras.extend(_eliminar(linea).split())
+        if lineas_iniciales is not None:
+            lineas_iniciales.append(linea)
+            if len(palabras) <= palabras_por_fragmento:
+                continue
+            lineas_iniciales = None  # Habrá varios fragmentos de palabras unidas
+        while len(palabras) >= palabras_por_fragmento:
+            yield ' '.join(palabras[:palabras_por_fragmento])
+            del palabras[:palabras_por_fragmento]
+    
+    if lineas_iniciales is not None:
+        texto = limpiar_texto(''.join(lineas_iniciales))
+        if texto:
+            yield texto
+    elif palabras:
+        yield ' '.join(palabras)
+
+def procesar_archivo(archivo, palabras_por_fragmento=PALABRAS_POR_FRAGMENTO):
+    """Limpia y fragmenta un archivo de corpus/ en un archivo temporal propio.
+
+    Los fragmentos se escriben en UTF-8 uno detrás de otro en
+    corpus_procesado/temporal/; el proceso principal los pasa al almacén.
+    Devuelve (archivo, lista de (bytes, palabras) por fragmento, error).
+    """
+    fragmentos = []
+    try:
+        with open(f"corpus/{archivo}", "r", encoding="utf-8") as f, \
+                open(_ruta_temporal(archivo), "wb") as salida:
+            for fragmento in fragmentar_lineas(f, palabras_por_fragmento):
+                datos = fragmento.encode("utf-8")
+                salida.write(datos)
+                fragmentos.append((len(datos), len(fragmento.split())))
+    except Exception as e:
+        return archivo, fragmentos, e
+    return archivo, fragmentos, None
+
+def _ruta_temporal(archivo):
+    return os.path.join(TEMPORAL, archivo + ".frag")
+
+def _resultados(archivos, workers):
+    """Resultados de procesar_archivo en el orden de `archivos`, a medida que terminan"""
+    if workers <= 1:
+        yield from map(procesar_archivo, archivos)
+        return
+    with Pool(workers) as pool:
+        yield from pool.imap(procesar_archivo, archivos, chunksize=4)
+
+def hash_archivo(ruta):
+    """SHA-256 del contenido de un archivo, leído por bloques"""
+    h = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+def cargar_manifiesto(generacion):
+    """Hash, mtime, tamaño e ids de fragmentos de cada archivo ya procesado.
+
+    Devuelve None si el manifiesto es de otra generación del almacén: sus
+    ids ya no apuntan a los mismos fragmentos.
+    """
+    if not os.path.exists(MANIFIESTO):
+        return {}
+    with open(MANIFIESTO, "r", encoding="utf-8") as f:
+        manifiesto = json.load(f)
+    if manifiesto.get("formato") != FORMATO_MANIFIESTO:
+        _migrar_archivos_sueltos(manifiesto)
+        return {}
+    if manifiesto.get("generacion", 0) != generacion:
+        return None
+    return manifiesto["archivos"]
+
+def guardar_manifiesto(archivos, generacion):
+    """Escribe el manifiesto de forma atómica (primero a un temporal)"""
+    temporal = MANIFIESTO + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump({"formato": FORMATO_MANIFIESTO, "generacion": generacion,
+                   "archivos": archivos}, f, ensure_ascii=False, indent=1)
+    os.replace(temporal, MANIFIESTO)
+
+def _migrar_archivos_sueltos(manifiesto_viejo):
+    """Borra los _fragNNN.txt y el consolidado de versiones anteriores"""
+    print("♻️ Manifiesto de formato anterior: se reprocesa todo en el almacén de fragmentos")
+    for entrada in manifiesto_viejo.values():
+        for nombre_fragmento, _ in entrada.get("fragmentos", []):
+            ruta = f"corpus_procesado/{nombre_fragmento}"
+            if os.path.exists(ruta):
+                os.remove(ruta)
+    if os.path.exists(CONSOLIDADO_ANTERIOR):
+        os.remove(CONSOLIDADO_ANTERIOR)
+
+def _pasar_al_almacen(almacen, archivo, fragmentos):
+    """Copia los fragmentos del archivo temporal al almacén y devuelve [[id, palabras], ...]"""
+    ids = []
+    ruta = _ruta_temporal(archivo)
+    with open(ruta, "rb") as f:
+        for numero, (longitud, palabras) in enumerate(fragmentos, 1):
+            texto = f.read(longitud).decode("utf-8")
+            id_fragmento = almacen.agregar(texto, {"archivo_original": archivo,
+                                                   "numero": numero, "palabras": palabras})
+            ids.append([id_fragmento, palabras])
+    os.remove(ruta)
+    return ids
+
+def procesar_corpus(workers=1, completo=False):
+    """Procesa los textos nuevos o modificados de la carpeta corpus/
+
+    Los fragmentos se agregan al almacén de corpus_procesado/ (ver
+    almacen_fragmentos.py). El manifiesto guarda hash, mtime e ids de cada
+    archivo fuente: los que no cambiaron no se vuelven a procesar y los
+    fragmentos de archivos eliminados o modificados quedan sin uso hasta que
+    se compacta el almacén. Con completo=True se reprocesa todo. Con
+    workers > 1 los archivos se limpian y fragmentan en un pool de procesos.
+    """
     if not os.path.exists("corpus"):
         print("❌ No existe la carpeta 'corpus/'. Ejecuta primero 01_recolectar_corpus.py")
         return
@@ -36,68 +186,102 @@ def procesar_corpus():
     if not os.path.exists("corpus_procesado"):
         os.makedirs("corpus_procesado")
     
-    archivos_txt = [f for f in os.listdir("corpus") if f.endswith(".txt")]
+    archivos_txt = sorted(f for f in os.listdir("corpus") if f.endswith(".txt"))
     
     if not archivos_txt:
         print("❌ No hay archivos .txt en la carpeta 'corpus/'")
         return
     
-    print(f"📚 Procesando {len(archivos_txt)} archivos...")
-    
-    todos_fragmentos = []
-    metadata = []
+    with AlmacenFragmentos(ALMACEN) as almacen:
+        generacion = almacen.generacion
+    manifiesto = cargar_manifiesto(generacion)
+    if manifiesto is None:
+        print("⚠️ El manifiesto no corresponde a la generación del almacén: se reprocesa todo")
+        completo = True
+    if completo:
+        manifiesto = {}
     
+    # Detectar cambios: el mtime y el tamaño evitan leer archivos que no se tocaron
+    pendientes = {}
     for archivo in archivos_txt:
-        try:
-            with open(f"corpus/{archivo}", "r", encoding="utf-8") as f:
-                contenido = f.read()
-            
-            if not contenido.strip():
-                print(f"⚠️ Archivo vacío: {archivo}")
+        estado = os.stat(f"corpus/{archivo}")
+        entrada = manifiesto.get(archivo)
+        if entrada and entrada["mtime"] == estado.st_mtime_ns and entrada["tamano"] == estado.st_size:
+            continue
+        digest = hash_archivo(f"corpus/{archivo}")
+        if entrada and entrada["hash"] == digest:
+            entrada["mtime"] = estado.st_mtime_ns  # Se tocó pero el contenido es el mismo
+            continue
+        pendientes[archivo] = {"hash": digest, "mtime": estado.st_mtime_ns,
+                               "tamano": estado.st_size, "fragmentos": []}
+    
+    # Los fragmentos de archivos eliminados o modificados quedan como basura en el almacén
+    vigentes = set(archivos_txt)
+    eliminados = [archivo for archivo in manifiesto if archivo not in vigentes]
+    for archivo in eliminados:
+        del manifiesto[archivo]
+    modificados = [archivo for archivo in pendientes if archivo in manifiesto]
+    
+    print(f"📚 {len(archivos_txt)} archivos: {len(pendientes) - len(modificados)} nuevos, "
+          f"{len(modificados)} modificados, {len(eliminados)} eliminados")
+    if pendientes:
+        print(f"   Procesando {len(pendientes)} archivos con {workers} proceso(s)...")
+    
+    os.makedirs(TEMPORAL, exist_ok=True)
+    with AlmacenFragmentos(ALMACEN) as almacen:
+        if completo:
+            almacen.vaciar()
+        for archivo, fragmentos, error in _resultados(list(pendientes), workers):
+            if error is not None:
+                print(f"❌ Error procesando {archivo}: {error}")
+                if os.path.exists(_ruta_temporal(archivo)):
+                    os.remove(_ruta_temporal(archivo))
+                manifiesto.pop(archivo, None)  # Se reintenta en la próxima ejecución
                 continue
+            if not fragmentos:
+                print(f"⚠️ Archivo vacío: {archivo}")
+            else:
+                print(f"✅ {archivo}: {len(fragmentos)} fragmentos")
+            # Una entrada modificada conserva su posición en el manifiesto
+            manifiesto[archivo] = dict(pendientes[archivo],
+                                       fragmentos=_pasar_al_almacen(almacen, archivo, fragmentos))
+        almacen.guardar()
+        guardar_manifiesto(manifiesto, almacen.generacion)
+        
+        # Compactar cuando la basura supera a los fragmentos vigentes
+        vivos = [id_fragmento for entrada in manifiesto.values()
+                 for id_fragmento, _ in entrada["fragmentos"]]
+        if len(almacen) - len(vivos) > len(vivos):
+            print(f"🗜️ Compactando almacén ({len(almacen) - len(vivos)} fragmentos sin uso)...")
             
-            # Limpiar
-            contenido_limpio = limpiar_texto(contenido)
-            
-            # Dividir
-            fragmentos = dividir_en_fragmentos(contenido_limpio, palabras_por_fragmento=400)
-            
-            # Guardar cada fragmento individualmente
-            for i, fragmento in enumerate(fragmentos):
-                if fragmento.strip():
-                    nombre_fragmento = f"{archivo[:-4]}_frag{i+1:03d}.txt"
-                    ruta_fragmento = f"corpus_procesado/{nombre_fragmento}"
-                    
-                    with open(ruta_fragmento, "w", encoding="utf-8") as f:
-                        f.write(fragmento)
-                    
-                    todos_fragmentos.append(fragmento)
-                    metadata.append({
-                        "archivo_original": archivo,
-                        "fragmento": nombre_fragmento,
-                        "palabras": len(fragmento.split())
-                    })
-            
-            print(f"✅ {archivo}: {len(fragmentos)} fragmentos")
+            def confirmar(nuevos, generacion):
+                # Los ids nuevos se guardan antes de reemplazar los archivos del almacén
+                for entrada in manifiesto.values():
+                    entrada["fragmentos"] = [[nuevos[i], palabras]
+                                             for i, palabras in entrada["fragmentos"]]
+                guardar_manifiesto(manifiesto, generacion)
             
-        except Exception as e:
-            print(f"❌ Error procesando {archivo}: {e}")
+            almacen.compactar(vivos, confirmar)
+    shutil.rmtree(TEMPORAL, ignore_errors=True)
     
-    # Guardar lista completa de fragmentos
-    if todos_fragmentos:
-        with open("corpus_procesado/!todos_fragmentos.txt", "w", encoding="utf-8") as f:
-            for frag in todos_fragmentos:
-                f.write(f"--- FRAGMENTO ---\n{frag}\n\n")
-        
+    total = sum(len(entrada["fragmentos"]) for entrada in manifiesto.values())
+    if total:
         print(f"\n🎉 Procesamiento completo:")
-        print(f"   • Fragmentos totales: {len(todos_fragmentos)}")
-        print(f"   • Carpeta 'corpus_procesado/' creada con resultados")
-        print(f"   • Archivo consolidado: '!todos_fragmentos.txt'")
+        print(f"   • Fragmentos totales: {total}")
+        print(f"   • Almacén de fragmentos: '{ALMACEN}/fragmentos.bin' (+ .idx y .jsonl)")
+        print(f"   • Manifiesto: '{MANIFIESTO}'")
     else:
         print("\n⚠️ No se generaron fragmentos. Revisa los archivos fuente.")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Limpia y fragmenta los textos de corpus/")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="procesos para limpiar y fragmentar archivos en paralelo")
+    parser.add_argument("--completo", action="store_true",
+                        help="reprocesa todos los archivos aunque no hayan cambiado")
+    args = parser.parse_args()
+    
     print("="*60)
     print("🧹 PREPROCESADOR DE TEXTOS")
     print("="*60)
-    procesar_corpus()
\ No newline at end of file
+    procesar_corpus(args.workers, args.completo)
@@ -1,18 +1,30 @@
 import os
+import io
 import glob
-from typing import List, Dict, Any
-import PyPDF2  
-from sentence_transformers import SentenceTransformer
+import json
+import time
+import argparse
+from itertools import islice
+from typing import List, Dict, Any, Iterator, Optional
 import numpy as np
 
+from almacen_fragmentos import AlmacenFragmentos
+from cache_embeddings import CacheEmbeddings
+from extraccion_pdf import extraer_paginas
+from modelo_embeddings import BACKENDS, BACKEND_EMBEDDINGS, cargar_modelo, nombre_en_cache
+
 # ---------------------------------------------------------
 # CONFIGURACIÓN
 # ---------------------------------------------------------
 CORPUS_PATH = "corpus_procesado"  
 MODEL_NAME = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2" 
+BACKEND = BACKEND_EMBEDDINGS  # "torch" o "onnx-int8" (ver modelo_embeddings.py); --backend lo cambia
 
 CHUNK_SIZE = 500  
 OVERLAP = 50     
+TAMANO_LOTE = 64  # Chunks por lote en el modo streaming
+FILAS_POR_BLOQUE = 4096  # Crecimiento de embeddings.npy cuando no se sabe el total
+CACHE_EMBEDDINGS = "corpus_embeddings/cache"  # Vectores ya calculados, por modelo y hash del texto
 
 # ---------------------------------------------------------
 # 1. FUNCIÓN PARA LEER DIFERENTES FORMATOS DE ARCHIVO
@@ -27,10 +39,8 @@ def leer_archivo(ruta_archivo: str) -> str:
     
     elif ruta_archivo.endswith('.pdf'):
         try:
-            with open(ruta_archivo, 'rb') as f:
-                lector = PyPDF2.PdfReader(f)
-                for pagina in lector.pages:
-                    texto += pagina.extract_text() + "\n"
+            # Páginas en paralelo con PyPDF2 (ver extraccion_pdf.py)
+            texto = "".join(pagina + "\n" for pagina in extraer_paginas(ruta_archivo, "pypdf2"))
         except Exception as e:
             print(f"Error leyendo PDF {ruta_archivo}: {e}")
     
@@ -70,8 +80,10 @@ def dividir_en_chunks(texto: str, chunk_size: int = CHUNK_SIZE, overlap: int = O
 # ---------------------------------------------------------
 def procesar_corpus(corpus_path: str) -> List[Dict[str, Any]]:
     """Recorre todas las carpetas, lee archivos y prepara chunks con metadatos."""
-    documentos = []
-    
+    return list(iterar_corpus(corpus_path))
+
+def iterar_corpus(corpus_path: str) -> Iterator[Dict[str, Any]]:
+    """Como procesar_corpus, pero genera los chunks de a uno (un archivo en memoria a la vez)."""
     # Recorrer cada carpeta temática
     for carpeta in os.listdir(corpus_path):
         ruta_carpeta = os.path.join(corpus_path, carpeta)
@@ -111,22 +123,137 @@ def procesar_corpus(corpus_path: str) -> List[Dict[str, Any]]:
                     'total_chunks': len(chunks),
                     'palabras': len(chunk.split())
                 }
-                documentos.append(documento)
+                yield documento
+
+def procesar_almacen(corpus_path: str) -> List[Dict[str, Any]]:
+    """Prepara chunks desde el almacén de fragmentos que escribe 02_preprocesar_textos.py.
+
+    Solo se leen los fragmentos vigentes según el manifiesto; cada uno se lee
+    por id desde el archivo mapeado en memoria.
+    """
+    return list(iterar_almacen(corpus_path))
+
+def iterar_almacen(corpus_path: str) -> Iterator[Dict[str, Any]]:
+    """Como procesar_almacen, pero genera los chunks de a uno."""
+    with open(os.path.join(corpus_path, "manifiesto.json"), 'r', encoding='utf-8') as f:
+        manifiesto = json.load(f)
+    vigentes = {id_fragmento for entrada in manifiesto["archivos"].values()
+                for id_fragmento, _ in entrada["fragmentos"]}
+    print(f"Leyendo {len(vigentes)} fragmentos del almacén")
     
-    return documentos
+    with AlmacenFragmentos(corpus_path) as almacen:
+        if manifiesto.get("generacion", 0) != almacen.generacion:
+            raise RuntimeError(f"El manifiesto de {corpus_path}/ no corresponde a la generación "
+                               f"del almacén; vuelve a ejecutar 02_preprocesar_textos.py")
+        for id_fragmento, texto, meta in almacen.iterar(vigentes):
+            chunks = dividir_en_chunks(texto)
+            for i, chunk in enumerate(chunks):
+                yield {
+                    'id': f"{meta['archivo_original']}_{meta['numero']}_{i}",
+                    'texto': chunk,
+                    'carpeta': 'corpus',
+                    'archivo': meta['archivo_original'],
+                    'fragmento_id': id_fragmento,
+                    'chunk_num': i,
+                    'total_chunks': len(chunks),
+                    'palabras': len(chunk.split())
+                }
+
+def contar_chunks(corpus_path: str) -> Optional[int]:
+    """Cantidad de chunks del almacén según las palabras de cada fragmento en el manifiesto.
+
+    dividir_en_chunks solo depende de la cantidad de palabras, así que no
+    hace falta leer los textos. Devuelve None si no hay almacén.
+    """
+    if not AlmacenFragmentos.existe(corpus_path):
+        return None
+    with open(os.path.join(corpus_path, "manifiesto.json"), 'r', encoding='utf-8') as f:
+        archivos = json.load(f)["archivos"]
+    paso = CHUNK_SIZE - OVERLAP
+    return sum(1 if palabras <= CHUNK_SIZE else -(-palabras // paso)
+               for entrada in archivos.values() for _, palabras in entrada["fragmentos"])
+
+def iterar_chunks(corpus_path: str) -> Iterator[Dict[str, Any]]:
+    """Chunks del almacén de fragmentos si existe; si no, de las carpetas temáticas."""
+    if AlmacenFragmentos.existe(corpus_path):
+        return iterar_almacen(corpus_path)
+    return iterar_corpus(corpus_path)
 
 # ---------------------------------------------------------
 # 4. FUNCIÓN PARA GENERAR EMBEDDINGS
 # ---------------------------------------------------------
-def generar_embeddings(documentos: List[Dict[str, Any]], model_name: str = MODEL_NAME):
-    """Genera embeddings para todos los documentos."""
-    print(f"\nCargando modelo de embeddings: {model_name}")
-    modelo = SentenceTransformer(model_name)
+class Codificador:
+    """Codifica textos con el modelo en `workers` procesos y mide el rendimiento.
+
+    Los textos se ordenan por longitud antes de repartirlos, así cada lote
+    tiene chunks de largo parecido y se desperdicia menos relleno (padding);
+    los vectores se devuelven en el orden original. Con workers > 1 se usa
+    el pool multiproceso de SentenceTransformer.
+    """
+    
+    def __init__(self, modelo, workers: int = 1, lote: int = 32, barra: bool = False):
+        self.modelo = modelo
+        self.workers = workers
+        self.lote = lote
+        self.barra = barra
+        self.chunks = 0
+        self.segundos = 0.0
+        self.pool = None
+        if workers > 1:
+            self.pool = modelo.start_multi_process_pool(target_devices=["cpu"] * workers)
+    
+    def __call__(self, textos: List[str]) -> np.ndarray:
+        inicio = time.perf_counter()
+        orden = np.argsort([-len(texto) for texto in textos], kind="stable")
+        ordenados = [textos[i] for i in orden]
+        if self.pool is not None:
+            vectores = self.modelo.encode_multi_process(ordenados, self.pool, batch_size=self.lote)
+        else:
+            vectores = self.modelo.encode(ordenados, batch_size=self.lote,
+                                          show_progress_bar=self.barra, convert_to_numpy=True)
+        resultado = np.empty_like(vectores)
+        resultado[orden] = vectores
+        self.chunks += len(textos)
+        self.segundos += time.perf_counter() - inicio
+        return resultado
+    
+    def rendimiento(self) -> str:
+        por_segundo = self.chunks / self.segundos if self.segundos else 0
+        return (f"⚡ {self.chunks} chunks codificados en {self.segundos:.1f} s con "
+                f"{self.workers} proceso(s): {por_segundo:.1f} chunks/s")
+    
+    def cerrar(self):
+        if self.pool is not None:
+            self.modelo.stop_multi_process_pool(self.pool)
+            self.pool = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+def generar_embeddings(documentos: List[Dict[str, Any]], model_name: str = MODEL_NAME,
+                       usar_cache: bool = True, workers: int = 1):
+    """Genera embeddings para todos los documentos.
+
+    Con `usar_cache` solo se codifican los chunks cuyo texto no está en la
+    caché de embeddings del modelo (ver cache_embeddings.py).
+    """
+    print(f"\nCargando modelo de embeddings: {model_name} ({BACKEND})")
+    modelo = cargar_modelo(model_name, BACKEND)
     
     textos = [doc['texto'] for doc in documentos]
     
     print(f"Generando embeddings para {len(textos)} chunks...")
-    embeddings = modelo.encode(textos, show_progress_bar=True, convert_to_numpy=True)
+    with Codificador(modelo, workers, barra=True) as codificar:
+        if usar_cache:
+            cache = CacheEmbeddings(CACHE_EMBEDDINGS, nombre_en_cache(model_name, BACKEND))
+            embeddings = cache.codificar(textos, codificar)
+            print(cache.resumen())
+        else:
+            embeddings = codificar(textos)
+    print(codificar.rendimiento())
     
     # Añadir embeddings a cada documento
     for i, doc in enumerate(documentos):
@@ -138,13 +265,16 @@ def generar_embeddings(documentos: List[Dict[str, Any]], model_name: str = MODEL
 # ---------------------------------------------------------
 # 5. GUARDAR LOS RESULTADOS
 # ---------------------------------------------------------
-def guardar_resultados(documentos: List[Dict[str, Any]], ruta_salida: str = "corpus_embeddings"):
+def guardar_resultados(documentos: List[Dict[str, Any]], ruta_salida: str = "corpus_embeddings",
+                       model_name: str = MODEL_NAME):
     """Guarda los documentos con embeddings en archivos NPZ y JSON."""
     import json
     import numpy as np
     
     # Crear carpeta si no existe
     os.makedirs(ruta_salida, exist_ok=True)
+    _borrar_salidas(ruta_salida, ("embeddings.npy", "metadatos.jsonl"))
+    _guardar_modelo(ruta_salida, model_name)
     
     # Separar embeddings y metadatos
     embeddings = np.array([doc.pop('embedding') for doc in documentos])  # Removemos embedding del dict
@@ -169,18 +299,187 @@ def guardar_resultados(documentos: List[Dict[str, Any]], ruta_salida: str = "cor
     print(f"  - embeddings.npz: {embeddings.shape[0]} embeddings de dimensión {embeddings.shape[1]}")
     print(f"  - metadatos.json: {len(documentos)} documentos con metadatos")
     print(f"  - textos.txt: muestra de los textos")
+    print(f"  - modelo.json: modelo y backend ({BACKEND}) de los embeddings")
+
+def _guardar_modelo(ruta_salida: str, model_name: str) -> None:
+    """Anota con qué modelo y backend se generaron los embeddings; 04 lee el backend de acá."""
+    with open(os.path.join(ruta_salida, "modelo.json"), 'w', encoding='utf-8') as f:
+        json.dump({"modelo": model_name, "backend": BACKEND}, f, indent=2)
+
+def _borrar_salidas(ruta_salida: str, nombres) -> None:
+    """Borra las salidas del otro modo para que 04 no lea embeddings desactualizados."""
+    for nombre in nombres:
+        ruta = os.path.join(ruta_salida, nombre)
+        if os.path.exists(ruta):
+            os.remove(ruta)
+
+# ---------------------------------------------------------
+# 5b. MODO STREAMING (MEMORIA ACOTADA)
+# ---------------------------------------------------------
+def vectorizar_streaming(corpus_path: str = CORPUS_PATH, ruta_salida: str = "corpus_embeddings",
+                         model_name: str = MODEL_NAME, lote: int = TAMANO_LOTE,
+                         usar_cache: bool = True, workers: int = 1):
+    """Genera y guarda los embeddings por lotes, sin tener el corpus en memoria.
+
+    `embeddings.npy` (float32 mapeado en memoria) se preasigna con la
+    cantidad de chunks del manifiesto del almacén; sin almacén se desconoce,
+    así que el archivo crece por bloques y se recorta al final. Cada lote se
+    codifica y se escribe directo en su tramo del archivo, y sus metadatos
+    se agregan a `metadatos.jsonl`: la memoria usada no depende del tamaño
+    del corpus. Con workers > 1 cada lectura junta `lote * workers` chunks
+    para repartir. Devuelve (chunks, dimensión).
+    """
+    total = contar_chunks(corpus_path)
+    chunks = iterar_chunks(corpus_path)
+    documentos = list(islice(chunks, lote * workers))
+    if not documentos:
+        return 0, 0
+    print(f"\nCargando modelo de embeddings: {model_name} ({BACKEND})")
+    modelo = cargar_modelo(model_name, BACKEND)
+    dimension = modelo.get_sentence_embedding_dimension()
+    codificar = Codificador(modelo, workers, lote)
+    cache = CacheEmbeddings(CACHE_EMBEDDINGS, nombre_en_cache(model_name, BACKEND)) if usar_cache else None
+    
+    os.makedirs(ruta_salida, exist_ok=True)
+    _borrar_salidas(ruta_salida, ("embeddings.npz", "metadatos.json", "textos.txt"))
+    _guardar_modelo(ruta_salida, model_name)
+    ruta_embeddings = os.path.join(ruta_salida, "embeddings.npy")
+    capacidad = total or FILAS_POR_BLOQUE
+    embeddings = np.lib.format.open_memmap(ruta_embeddings, mode="w+", dtype=np.float32,
+                                           shape=(capacidad, dimension))
+    
+    print(f"Generando embeddings para {total or 'los'} chunks en lotes de {lote}...")
+    inicio = time.perf_counter()
+    escritos = 0
+    with codificar, open(os.path.join(ruta_salida, "metadatos.jsonl"), 'w', encoding='utf-8') as f:
+        while documentos:
+            if escritos + len(documentos) > capacidad:
+                del embeddings
+                capacidad = max(2 * capacidad, escritos + len(documentos))
+                embeddings = _redimensionar_npy(ruta_embeddings, capacidad)
+            textos = [doc['texto'] for doc in documentos]
+            vectores = codificar(textos) if cache is None else cache.codificar(textos, codificar)
+            embeddings[escritos:escritos + len(documentos)] = vectores
+            for doc in documentos:
+                f.write(json.dumps(doc, ensure_ascii=False) + "\n")
+            escritos += len(documentos)
+            print(f"  {escritos}/{total or '?'} chunks", end="\r")
+            documentos = list(islice(chunks, lote * workers))
+    embeddings.flush()
+    del embeddings
+    total = escritos
+    if capacidad != total:
+        _redimensionar_npy(ruta_embeddings, total)  # Recorta el bloque sin usar
+    
+    segundos = time.perf_counter() - inicio
+    print(f"\n✓ Embeddings generados en {segundos:.1f} s ({total / max(segundos, 1e-9):.1f} chunks/s)")
+    print(codificar.rendimiento())
+    if cache is not None:
+        print(cache.resumen())
+    print(f"\n✓ Resultados guardados en: {ruta_salida}/")
+    print(f"  - embeddings.npy: {total} embeddings de dimensión {dimension} (float32)")
+    print(f"  - metadatos.jsonl: {total} documentos con metadatos")
+    print(f"  - modelo.json: modelo y backend ({BACKEND}) de los embeddings")
+    return total, dimension
+
+def _redimensionar_npy(ruta: str, filas: int) -> np.memmap:
+    """Cambia la cantidad de filas de un .npy 2D y lo vuelve a mapear en memoria.
+
+    NumPy deja espacio en la cabecera para que la primera dimensión crezca:
+    se reescribe la cabecera y se alarga o recorta el archivo sin mover los
+    datos. Si la cabecera nueva no entra, se copian las filas a otro archivo.
+    """
+    with open(ruta, "r+b") as f:
+        version = np.lib.format.read_magic(f)
+        forma, orden_fortran, dtype = (np.lib.format.read_array_header_1_0(f) if version == (1, 0)
+                                       else np.lib.format.read_array_header_2_0(f))
+        inicio = f.tell()
+        cabecera = io.BytesIO()
+        nueva = {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": orden_fortran,
+                 "shape": (filas,) + forma[1:]}
+        np.lib.format.write_array_header_1_0(cabecera, nueva)
+        if len(cabecera.getvalue()) == inicio and version == (1, 0):
+            f.seek(0)
+            f.write(cabecera.getvalue())
+            f.truncate(inicio + filas * int(np.prod(forma[1:])) * dtype.itemsize)
+            return np.lib.format.open_memmap(ruta, mode="r+")
+    viejo = np.load(ruta, mmap_mode="r")
+    copia = np.lib.format.open_memmap(ruta + ".tmp", mode="w+", dtype=dtype, shape=nueva["shape"])
+    for desde in range(0, min(filas, len(viejo)), FILAS_POR_BLOQUE):
+        hasta = min(desde + FILAS_POR_BLOQUE, filas, len(viejo))
+        copia[desde:hasta] = viejo[desde:hasta]
+    copia.flush()
+    del viejo, copia
+    os.replace(ruta + ".tmp", ruta)
+    return np.lib.format.open_memmap(ruta, mode="r+")
+
+# ---------------------------------------------------------
+# 5c. RENDIMIENTO SEGÚN CANTIDAD DE PROCESOS
+# ---------------------------------------------------------
+def comparar_workers(cantidades: List[int], muestra: int = 2000, corpus_path: str = CORPUS_PATH,
+                     model_name: str = MODEL_NAME, lote: int = TAMANO_LOTE):
+    """Codifica los primeros `muestra` chunks con cada cantidad de procesos e imprime chunks/s.
+
+    Sirve para dimensionar máquinas; no usa la caché ni escribe resultados.
+    """
+    textos = [doc['texto'] for doc in islice(iterar_chunks(corpus_path), muestra)]
+    if not textos:
+        print("❌ No se encontraron documentos para procesar.")
+        return
+    modelo = cargar_modelo(model_name, BACKEND)
+    print(f"\n{'procesos':>8} {'arranque (s)':>13} {'codificar (s)':>14} {'chunks/s':>10}")
+    for workers in cantidades:
+        inicio = time.perf_counter()
+        with Codificador(modelo, workers, lote) as codificar:
+            arranque = time.perf_counter() - inicio
+            codificar(textos)
+        print(f"{workers:>8} {arranque:>13.2f} {codificar.segundos:>14.2f} "
+              f"{len(textos) / codificar.segundos:>10.1f}")
 
 # ---------------------------------------------------------
 # 6. EJECUCIÓN PRINCIPAL
 # ---------------------------------------------------------
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera los embeddings del corpus procesado")
+    parser.add_argument("--streaming", action="store_true",
+                        help="codifica por lotes y escribe a disco con memoria acotada")
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE,
+                        help="chunks por lote en el modo streaming")
+    parser.add_argument("--sin-cache", action="store_true",
+                        help="codifica todos los chunks sin usar ni actualizar la caché de embeddings")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="procesos para codificar (pool multiproceso de SentenceTransformer)")
+    parser.add_argument("--comparar-workers", metavar="N,N,...",
+                        help="mide chunks/s con cada cantidad de procesos (p. ej. 1,2,4) y termina")
+    parser.add_argument("--muestra", type=int, default=2000,
+                        help="chunks usados por --comparar-workers")
+    parser.add_argument("--backend", choices=BACKENDS, default=BACKEND,
+                        help="backend del modelo de embeddings (por defecto RAG_BACKEND_EMBEDDINGS o torch)")
+    args = parser.parse_args()
+    BACKEND = args.backend
+    
     print("=" * 60)
     print("PROCESAMIENTO DE CORPUS PARA SISTEMA RAG")
     print("=" * 60)
     
+    if args.comparar_workers:
+        comparar_workers([int(n) for n in args.comparar_workers.split(",")], args.muestra,
+                         lote=args.lote)
+        exit()
+    
+    if args.streaming:
+        print("\n🌊 Modo streaming: chunks, embeddings y metadatos por lotes")
+        total, _ = vectorizar_streaming(lote=args.lote, usar_cache=not args.sin_cache,
+                                        workers=args.workers)
+        if not total:
+            print("❌ No se encontraron documentos para procesar.")
+        else:
+            print("\n✅ ¡Paso 1 completado!")
+        exit()
+    
     # Paso 1: Procesar corpus y crear chunks
     print("\n📂 1. Procesando estructura de carpetas...")
-    documentos = procesar_corpus(CORPUS_PATH)
+    documentos = list(iterar_chunks(CORPUS_PATH))
     
     if not documentos:
         print("❌ No se encontraron documentos para procesar.")
@@ -190,7 +489,8 @@ if __name__ == "__main__":
     
     # Paso 2: Generar embeddings
     print("\n🔤 2. Generando embeddings...")
-    documentos_con_embeddings, embeddings = generar_embeddings(documentos)
+    documentos_con_embeddings, embeddings = generar_embeddings(documentos, usar_cache=not args.sin_cache,
+                                                               workers=args.workers)
     
     # Paso 3: Guardar resultados
     print("\n💾 3. Guardando resultados...")
@@ -210,4 +510,4 @@ if __name__ == "__main__":
     for i, doc in enumerate(documentos_con_embeddings[:3]):
         print(f"  {i+1}. [{doc['carpeta']}] {doc['texto'][:100]}...")
     
-    print("\n✅ ¡Paso 1 completado!")
\ No newline at end of file
+    print("\n✅ ¡Paso 1 completado!")
@@ -1,15 +1,21 @@
 import numpy as np
 import json
 import os
-from sentence_transformers import SentenceTransformer
 import faiss
 import pickle
 
+from modelo_embeddings import cargar_modelo
+
 # ---------------------------------------------------------
 # CONFIGURACIÓN
 # ---------------------------------------------------------
 EMBEDDINGS_PATH = "corpus_embeddings/embeddings.npz"
 METADATA_PATH = "corpus_embeddings/metadatos.json"
+# Salidas del modo --streaming de 03_vectorizar_corpus.py
+EMBEDDINGS_STREAMING_PATH = "corpus_embeddings/embeddings.npy"
+METADATA_STREAMING_PATH = "corpus_embeddings/metadatos.jsonl"
+# Modelo y backend con que 03_vectorizar_corpus.py generó los embeddings
+MODELO_EMBEDDINGS_PATH = "corpus_embeddings/modelo.json"
 FAISS_INDEX_PATH = "faiss_index"
 MODEL_NAME = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2" 
 
@@ -20,6 +26,15 @@ def cargar_datos_preprocesados():
     """Carga embeddings y metadatos guardados previamente."""
     print("📂 Cargando embeddings y metadatos...")
     
+    if os.path.exists(EMBEDDINGS_STREAMING_PATH):
+        # Mapeado en memoria: el arreglo no se copia al cargarlo
+        embeddings = np.load(EMBEDDINGS_STREAMING_PATH, mmap_mode='r')
+        print(f"  ✓ Embeddings cargados: {embeddings.shape}")
+        with open(METADATA_STREAMING_PATH, 'r', encoding='utf-8') as f:
+            metadatos = [json.loads(linea) for linea in f]
+        print(f"  ✓ Metadatos cargados: {len(metadatos)} documentos")
+        return embeddings, metadatos
+    
     # Cargar embeddings
     datos = np.load(EMBEDDINGS_PATH)
     embeddings = datos['embeddings']
@@ -32,6 +47,26 @@ def cargar_datos_preprocesados():
     
     return embeddings, metadatos
 
+def leer_backend():
+    """Backend con que se generaron los embeddings, anotado por 03 en modelo.json.
+
+    Las consultas deben codificarse con el mismo backend. Si además está
+    definida RAG_BACKEND_EMBEDDINGS y no coincide, se detiene en lugar de
+    mezclar vectores de dos backends.
+    """
+    if os.path.exists(MODELO_EMBEDDINGS_PATH):
+        with open(MODELO_EMBEDDINGS_PATH, 'r', encoding='utf-8') as f:
+            backend = json.load(f)["backend"]
+    else:
+        backend = "torch"  # Embeddings de antes de que 03 anotara el backend
+    configurado = os.environ.get("RAG_BACKEND_EMBEDDINGS")
+    if configurado and configurado != backend:
+        raise ValueError(f"Los embeddings se generaron con el backend {backend!r} pero "
+                         f"RAG_BACKEND_EMBEDDINGS={configurado!r}; vuelve a ejecutar "
+                         f"03_vectorizar_corpus.py --backend {configurado} o quita la variable")
+    print(f"  ✓ Backend de embeddings: {backend}")
+    return backend
+
 # ---------------------------------------------------------
 # 2. CREAR ÍNDICE FAISS
 # ---------------------------------------------------------
@@ -82,7 +117,7 @@ def crear_indice_faiss(embeddings, tipo_indice="flat"):
 # ---------------------------------------------------------
 # 3. GUARDAR ÍNDICE Y METADATOS
 # ---------------------------------------------------------
-def guardar_indice(index, metadatos, tipo_indice):
+def guardar_indice(index, metadatos, tipo_indice, backend):
     """Guarda el índice FAISS y los metadatos asociados."""
     os.makedirs(FAISS_INDEX_PATH, exist_ok=True)
     
@@ -102,7 +137,8 @@ def guardar_indice(index, metadatos, tipo_indice):
         "tipo_indice": tipo_indice,
         "dimension": index.d,
         "total_vectores": index.ntotal,
-        "modelo_embeddings": MODEL_NAME
+        "modelo_embeddings": MODEL_NAME,
+        "backend_embeddings": backend
     }
     
     config_file = os.path.join(FAISS_INDEX_PATH, "config.json")
@@ -158,6 +194,7 @@ def main():
     
     # Paso 1: Cargar datos
     embeddings, metadatos = cargar_datos_preprocesados()
+    backend = leer_backend()
     
     # Paso 2: Crear índice (elige el tipo que prefieras)
     # Opciones: "flat" (exacto), "ivf" (rápido), "hnsw" (recomendado)
@@ -165,11 +202,11 @@ def main():
     index = crear_indice_faiss(embeddings, tipo_indice=TIPO_INDICE)
     
     # Paso 3: Guardar índice
-    guardar_indice(index, metadatos, TIPO_INDICE)
+    guardar_indice(index, metadatos, TIPO_INDICE, backend)
     
     # Paso 4: Cargar modelo de embeddings para pruebas
     print("\n🤖 Cargando modelo para generar embeddings de consultas...")
-    modelo = SentenceTransformer(MODEL_NAME)
+    modelo = cargar_modelo(MODEL_NAME, backend)
     
     # Paso 5: Probar el índice
     probar_indice(index, metadatos, modelo)
@@ -234,4 +271,4 @@ if __name__ == "__main__":
         print("❌ FAISS no está instalado. Instálalo con:")
         print("   pip install faiss-cpu  # Para CPU")
         print("   # o")
-        print("   pip install faiss-gpu  # Para GPU (opcional)")
\ No newline at end of file
+        print("   pip install faiss-gpu  # Para GPU (opcional)")
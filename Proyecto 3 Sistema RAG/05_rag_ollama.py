@@ -7,7 +7,8 @@ import numpy as np
 from typing import List, Dict, Any
 from datetime import datetime
 import ollama
-from sentence_transformers import SentenceTransformer
+
+from modelo_embeddings import BACKEND_EMBEDDINGS, cargar_modelo
 
 # ---------------------------------------------------------
 # CONFIGURACIÓN
@@ -43,9 +44,10 @@ class RAGSystemOllama:
         self.index, self.metadatos, self.config = self._cargar_indice(faiss_index_path)
         print(f"   ✓ Índice cargado: {self.index.ntotal} documentos")
         
-        # Inicializar modelos
-        self.embedding_model = SentenceTransformer(EMBEDDING_MODEL)
-        print(f"   ✓ Modelo de embeddings cargado: {EMBEDDING_MODEL}")
+        # Inicializar modelos: las consultas usan el mismo backend que el índice
+        backend = self.config.get("backend_embeddings", BACKEND_EMBEDDINGS)
+        self.embedding_model = cargar_modelo(EMBEDDING_MODEL, backend)
+        print(f"   ✓ Modelo de embeddings cargado: {EMBEDDING_MODEL} ({backend})")
         
         # Asumir que Ollama está disponible (sin verificar lista de modelos)
         print(f"   ✓ Usando modelo Ollama: {OLLAMA_MODEL}")
@@ -386,4 +388,4 @@ if __name__ == "__main__":
         print("   2. Los archivos index_hnsw.faiss e index_metadata.pkl existan")
     
     except Exception as e:
-        print(f"❌ Error inesperado: {e}")
\ No newline at end of file
+        print(f"❌ Error inesperado: {e}")
@@ -0,0 +1,220 @@
+"""Almacén de fragmentos de solo agregado, compartido por los pasos 02 y 03.
+
+En lugar de un archivo .txt por fragmento se usan tres archivos:
+
+- fragmentos.bin:   los textos en UTF-8, uno detrás de otro
+- fragmentos.idx:   por cada fragmento, (offset, longitud) en bytes como int64
+- fragmentos.jsonl: una línea de metadatos por fragmento, en el mismo orden
+- fragmentos.gen:   la generación, que aumenta cada vez que cambian los ids
+
+El id de un fragmento es su posición en el índice. La lectura usa mmap, así
+que leer un fragmento por id no carga el resto del archivo en memoria.
+Borrar no reescribe nada: los fragmentos que ya no se usan quedan como
+basura hasta que se llama a `compactar`.
+
+Compactar o vaciar el almacén cambia los ids, así que quien los guarda
+(el manifiesto de 02) guarda también la generación y la compara al cargar.
+"""
+import os
+import json
+import mmap
+import shutil
+import struct
+
+import numpy as np
+
+_REGISTRO = struct.Struct("<qq")  # offset, longitud
+_COMPACTANDO = "compactando"
+
+
+class AlmacenFragmentos:
+    """Fragmentos de texto con metadatos guardados en tres archivos de solo agregado"""
+
+    def __init__(self, carpeta):
+        self.carpeta = carpeta
+        os.makedirs(carpeta, exist_ok=True)
+        self.ruta_textos = os.path.join(carpeta, "fragmentos.bin")
+        self.ruta_indice = os.path.join(carpeta, "fragmentos.idx")
+        self.ruta_metadatos = os.path.join(carpeta, "fragmentos.jsonl")
+        self.ruta_generacion = os.path.join(carpeta, "fragmentos.gen")
+        self._terminar_compactacion()
+        self._reparar()
+        self.generacion = _leer_generacion(self.ruta_generacion)
+        self._textos = open(self.ruta_textos, "ab")
+        self._indice = open(self.ruta_indice, "ab")
+        self._metadatos = open(self.ruta_metadatos, "a", encoding="utf-8")
+        self._total = os.path.getsize(self.ruta_indice) // _REGISTRO.size
+        self._mapa = None
+        self._offsets = None
+        self._lista_metadatos = None
+
+    @staticmethod
+    def existe(carpeta):
+        return os.path.exists(os.path.join(carpeta, "fragmentos.idx"))
+
+    def _terminar_compactacion(self):
+        """Completa una compactación ya confirmada o descarta una a medias"""
+        carpeta = os.path.join(self.carpeta, _COMPACTANDO)
+        if not os.path.isdir(carpeta):
+            return
+        if os.path.exists(os.path.join(carpeta, "fragmentos.gen")):
+            # La generación se mueve al final: mientras esté ahí, faltan archivos
+            for ruta in (self.ruta_textos, self.ruta_indice, self.ruta_metadatos,
+                         self.ruta_generacion):
+                origen = os.path.join(carpeta, os.path.basename(ruta))
+                if os.path.exists(origen):
+                    os.replace(origen, ruta)
+        shutil.rmtree(carpeta)
+
+    def _reparar(self):
+        """Descarta registros a medias de una ejecución interrumpida"""
+        for ruta in (self.ruta_textos, self.ruta_indice, self.ruta_metadatos):
+            if not os.path.exists(ruta):
+                open(ruta, "wb").close()
+        with open(self.ruta_metadatos, "rb") as f:
+            lineas = sum(1 for linea in f if linea.endswith(b"\n"))
+        total = min(os.path.getsize(self.ruta_indice) // _REGISTRO.size, lineas)
+        with open(self.ruta_indice, "r+b") as f:
+            f.truncate(total * _REGISTRO.size)
+        if lineas > total:
+            with open(self.ruta_metadatos, "r+b") as f:
+                tamano = sum(len(linea) for linea, _ in zip(f, range(total)))
+                f.truncate(tamano)
+        fin = 0
+        if total:
+            with open(self.ruta_indice, "rb") as f:
+                f.seek((total - 1) * _REGISTRO.size)
+                offset, longitud = _REGISTRO.unpack(f.read(_REGISTRO.size))
+                fin = offset + longitud
+        with open(self.ruta_textos, "r+b") as f:
+            f.truncate(fin)
+
+    def __len__(self):
+        return self._total
+
+    # --- Escritura ---------------------------------------------------------
+
+    def agregar(self, texto, metadatos):
+        """Agrega un fragmento al final y devuelve su id"""
+        datos = texto.encode("utf-8")
+        offset = self._textos.tell()
+        self._textos.write(datos)
+        self._indice.write(_REGISTRO.pack(offset, len(datos)))
+        self._metadatos.write(json.dumps(metadatos, ensure_ascii=False) + "\n")
+        self._total += 1
+        self._invalidar_lectura()
+        return self._total - 1
+
+    def guardar(self):
+        """Vacía los búferes a disco (textos antes que índice y metadatos)"""
+        self._textos.flush()
+        self._indice.flush()
+        self._metadatos.flush()
+
+    def cerrar(self):
+        self.guardar()
+        self._invalidar_lectura()
+        self._textos.close()
+        self._indice.close()
+        self._metadatos.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    # --- Lectura -----------------------------------------------------------
+
+    def _invalidar_lectura(self):
+        if self._mapa is not None:
+            self._mapa.close()
+        self._mapa = self._offsets = self._lista_metadatos = None
+
+    def _preparar_lectura(self):
+        if self._offsets is None:
+            self.guardar()
+            if self._total:
+                self._offsets = np.memmap(self.ruta_indice, dtype="<i8", mode="r",
+                                          shape=(self._total, 2))
+            else:
+                self._offsets = np.zeros((0, 2), dtype="<i8")
+            if os.path.getsize(self.ruta_textos):
+                with open(self.ruta_textos, "rb") as f:
+                    self._mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def leer(self, id_fragmento):
+        """Texto del fragmento `id_fragmento`"""
+        self._preparar_lectura()
+        offset, longitud = (int(valor) for valor in self._offsets[id_fragmento])
+        if not longitud:
+            return ""
+        return self._mapa[offset:offset + longitud].decode("utf-8")
+
+    def metadatos(self, id_fragmento):
+        if self._lista_metadatos is None:
+            self.guardar()
+            with open(self.ruta_metadatos, "r", encoding="utf-8") as f:
+                self._lista_metadatos = [json.loads(linea) for linea in f]
+        return self._lista_metadatos[id_fragmento]
+
+    def iterar(self, ids=None):
+        """Genera (id, texto, metadatos) leyendo los metadatos línea por línea.
+
+        Con `ids` (un conjunto) solo se devuelven esos fragmentos.
+        """
+        self._preparar_lectura()
+        with open(self.ruta_metadatos, "r", encoding="utf-8") as f:
+            for id_fragmento, linea in zip(range(self._total), f):
+                if ids is None or id_fragmento in ids:
+                    yield id_fragmento, self.leer(id_fragmento), json.loads(linea)
+
+    # --- Mantenimiento -----------------------------------------------------
+
+    def compactar(self, vivos, al_confirmar=None):
+        """Reescribe el almacén con solo los ids de `vivos` (en orden de id).
+
+        La copia se arma en compactando/ y se confirma escribiendo ahí la
+        nueva generación; recién entonces se llama a
+        `al_confirmar(nuevos, generacion)`, que debe guardar los ids nuevos,
+        y se reemplazan los archivos. Si el proceso se corta antes de la
+        confirmación la copia se descarta; si se corta después, la próxima
+        apertura termina de reemplazarlos. Devuelve {id viejo: id nuevo}.
+        """
+        carpeta = os.path.join(self.carpeta, _COMPACTANDO)
+        if os.path.isdir(carpeta):
+            shutil.rmtree(carpeta)
+        temporal = AlmacenFragmentos(carpeta)
+        nuevos = {}
+        for id_fragmento, texto, metadatos in self.iterar(set(vivos)):
+            nuevos[id_fragmento] = temporal.agregar(texto, metadatos)
+        temporal.cerrar()
+        _escribir_generacion(temporal.ruta_generacion, self.generacion + 1)
+        if al_confirmar is not None:
+            al_confirmar(nuevos, self.generacion + 1)
+        self.cerrar()
+        self.__init__(self.carpeta)
+        return nuevos
+
+    def vaciar(self):
+        """Borra todos los fragmentos; como al compactar, aumenta la generación"""
+        self.cerrar()
+        _escribir_generacion(self.ruta_generacion, self.generacion + 1)
+        for ruta in (self.ruta_textos, self.ruta_indice, self.ruta_metadatos):
+            open(ruta, "wb").close()
+        self.__init__(self.carpeta)
+
+
+def _leer_generacion(ruta):
+    if not os.path.exists(ruta):
+        return 0
+    with open(ruta, "r", encoding="utf-8") as f:
+        return int(f.read())
+
+
+def _escribir_generacion(ruta, generacion):
+    """Escribe la generación de forma atómica (primero a un temporal)"""
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        f.write(str(generacion))
+    os.replace(temporal, ruta)
@@ -0,0 +1,125 @@
+"""Compara el backend de embeddings float (PyTorch) con ONNX int8 sobre el corpus.
+
+Mide, para cada backend:
+
+- latencia por consulta: una consulta por llamada a encode, como en 05
+- rendimiento por lote: chunks/s codificando con distintos tamaños de lote
+- deriva de recall@k: fracción de los k vecinos más cercanos (L2, como el
+  índice FlatL2 de 04) con vectores float que se conservan con int8
+
+Usa los chunks de corpus_embeddings/ generados por 03_vectorizar_corpus.py.
+
+    python benchmark_embeddings.py --muestra 2000 --k 5
+"""
+import os
+import json
+import time
+import random
+import argparse
+
+import numpy as np
+
+from modelo_embeddings import cargar_modelo
+
+MODEL_NAME = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+RUTA_EMBEDDINGS = "corpus_embeddings"
+LOTES = (1, 8, 32, 128)
+
+CONSULTAS_EJEMPLO = [
+    "¿Qué son los algoritmos deshumanizantes?",
+    "Cómo afecta la ansiedad a la generación Z?",
+    "Qué es el filtro burbuja en redes sociales?",
+    "Habermas y la razón en el espacio público",
+    "Narcisismo en TikTok",
+]
+
+
+def cargar_textos(ruta=RUTA_EMBEDDINGS):
+    """Textos de los chunks guardados por 03 (modo streaming o en memoria)"""
+    jsonl = os.path.join(ruta, "metadatos.jsonl")
+    if os.path.exists(jsonl):
+        with open(jsonl, "r", encoding="utf-8") as f:
+            return [json.loads(linea)["texto"] for linea in f]
+    with open(os.path.join(ruta, "metadatos.json"), "r", encoding="utf-8") as f:
+        return [doc["texto"] for doc in json.load(f)]
+
+
+def armar_consultas(textos, cantidad, semilla=0):
+    """Consultas de ejemplo más el comienzo (12 palabras) de chunks elegidos al azar"""
+    azar = random.Random(semilla)
+    elegidos = azar.sample(textos, min(cantidad, len(textos)))
+    return CONSULTAS_EJEMPLO + [" ".join(texto.split()[:12]) for texto in elegidos]
+
+
+def medir_latencia(modelo, consultas):
+    """Milisegundos por consulta codificada de a una: (media, p50, p95)"""
+    modelo.encode(consultas[:1], convert_to_numpy=True)  # Calentamiento
+    tiempos = []
+    for consulta in consultas:
+        inicio = time.perf_counter()
+        modelo.encode([consulta], convert_to_numpy=True)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return float(np.mean(tiempos)), float(np.percentile(tiempos, 50)), float(np.percentile(tiempos, 95))
+
+
+def medir_rendimiento(modelo, textos, lote):
+    inicio = time.perf_counter()
+    modelo.encode(textos, batch_size=lote, convert_to_numpy=True)
+    return len(textos) / (time.perf_counter() - inicio)
+
+
+def vecinos(corpus, consultas, k):
+    """Índices de los k chunks más cercanos (L2) a cada consulta"""
+    distancias = ((consultas ** 2).sum(1)[:, None] - 2 * consultas @ corpus.T
+                  + (corpus ** 2).sum(1)[None, :])
+    return np.argsort(distancias, axis=1)[:, :k]
+
+
+def recall_en_k(referencia, obtenidos):
+    k = referencia.shape[1]
+    return float(np.mean([len(set(r) & set(o)) / k for r, o in zip(referencia, obtenidos)]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencia, rendimiento y recall@k: torch vs ONNX int8")
+    parser.add_argument("--muestra", type=int, default=2000, help="chunks del corpus a codificar")
+    parser.add_argument("--consultas", type=int, default=100, help="consultas armadas desde chunks")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    textos = cargar_textos()
+    random.Random(args.semilla).shuffle(textos)
+    textos = textos[:args.muestra]
+    consultas = armar_consultas(textos, args.consultas, args.semilla)
+    print(f"📚 {len(textos)} chunks y {len(consultas)} consultas de {RUTA_EMBEDDINGS}/")
+
+    resultados = {}
+    for backend in ("torch", "onnx-int8"):
+        print(f"\n🤖 Backend {backend}")
+        modelo = cargar_modelo(MODEL_NAME, backend)
+        media, p50, p95 = medir_latencia(modelo, consultas)
+        print(f"   Latencia por consulta: media {media:.2f} ms, p50 {p50:.2f} ms, p95 {p95:.2f} ms")
+        for lote in LOTES:
+            por_segundo = medir_rendimiento(modelo, textos[:512], lote)
+            print(f"   Lote {lote:>4}: {por_segundo:8.1f} chunks/s")
+        inicio = time.perf_counter()
+        corpus = modelo.encode(textos, batch_size=32, convert_to_numpy=True).astype(np.float32)
+        print(f"   Corpus codificado en {time.perf_counter() - inicio:.1f} s")
+        resultados[backend] = (corpus, modelo.encode(consultas, convert_to_numpy=True).astype(np.float32))
+
+    (corpus_f, consultas_f), (corpus_q, consultas_q) = resultados["torch"], resultados["onnx-int8"]
+    k = min(args.k, len(textos))
+    referencia = vecinos(corpus_f, consultas_f, k)
+    coseno = np.sum(corpus_f * corpus_q, axis=1) / (
+        np.linalg.norm(corpus_f, axis=1) * np.linalg.norm(corpus_q, axis=1))
+    print(f"\n📐 Similitud coseno float vs int8 del mismo chunk: media {coseno.mean():.4f}, "
+          f"mínima {coseno.min():.4f}")
+    print(f"🎯 recall@{k} con índice y consultas int8:        "
+          f"{recall_en_k(referencia, vecinos(corpus_q, consultas_q, k)):.3f}")
+    print(f"🎯 recall@{k} con índice float y consultas int8:  "
+          f"{recall_en_k(referencia, vecinos(corpus_f, consultas_q, k)):.3f}")
+
+
+if __name__ == "__main__":
+    main()
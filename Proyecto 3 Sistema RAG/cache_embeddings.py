@@ -0,0 +1,98 @@
+"""Caché en disco de embeddings por (modelo, hash del texto del chunk).
+
+Codificar es el paso más caro de 03_vectorizar_corpus.py. Cada vector
+calculado se guarda junto al SHA-256 de su texto, así que al volver a
+ejecutar solo se codifican los chunks nuevos o modificados. Cada modelo usa
+su propia carpeta, con dos archivos de solo agregado:
+
+- hashes.bin:   SHA-256 de cada texto (32 bytes por fila)
+- vectores.f32: el embedding de cada fila como float32
+"""
+import os
+import json
+import hashlib
+
+import numpy as np
+
+_BYTES_HASH = 32
+
+
+class CacheEmbeddings:
+    """Vectores ya calculados por un modelo, buscados por el hash del texto"""
+
+    def __init__(self, carpeta, modelo):
+        self.carpeta = os.path.join(carpeta, modelo.replace("/", "__"))
+        os.makedirs(self.carpeta, exist_ok=True)
+        self.ruta_hashes = os.path.join(self.carpeta, "hashes.bin")
+        self.ruta_vectores = os.path.join(self.carpeta, "vectores.f32")
+        self.ruta_info = os.path.join(self.carpeta, "info.json")
+        self.dimension = None
+        if os.path.exists(self.ruta_info):
+            with open(self.ruta_info, "r", encoding="utf-8") as f:
+                self.dimension = json.load(f)["dimension"]
+        self.filas = {}  # hash -> fila
+        self._vectores = None
+        self._cargar()
+        self.aciertos = 0
+        self.codificados = 0
+
+    def _cargar(self):
+        if self.dimension is None or not os.path.exists(self.ruta_hashes):
+            return
+        # Una ejecución interrumpida puede dejar un archivo más largo que el otro
+        filas = min(os.path.getsize(self.ruta_hashes) // _BYTES_HASH,
+                    os.path.getsize(self.ruta_vectores) // (4 * self.dimension))
+        with open(self.ruta_hashes, "r+b") as f:
+            f.truncate(filas * _BYTES_HASH)
+            hashes = f.read()
+        with open(self.ruta_vectores, "r+b") as f:
+            f.truncate(filas * 4 * self.dimension)
+        self.filas = {hashes[i:i + _BYTES_HASH]: i // _BYTES_HASH
+                      for i in range(0, len(hashes), _BYTES_HASH)}
+
+    def __len__(self):
+        return len(self.filas)
+
+    def _leer(self, filas):
+        if self._vectores is None or len(self._vectores) < len(self.filas):
+            self._vectores = np.memmap(self.ruta_vectores, dtype=np.float32, mode="r",
+                                       shape=(len(self.filas), self.dimension))
+        return self._vectores[filas]
+
+    def _agregar(self, hashes, vectores):
+        vectores = np.ascontiguousarray(vectores, dtype=np.float32)
+        if self.dimension is None:
+            self.dimension = vectores.shape[1]
+            with open(self.ruta_info, "w", encoding="utf-8") as f:
+                json.dump({"dimension": self.dimension}, f)
+        # Vectores antes que hashes: una fila sin hash se descarta al cargar
+        with open(self.ruta_vectores, "ab") as f:
+            f.write(vectores.tobytes())
+        with open(self.ruta_hashes, "ab") as f:
+            f.write(b"".join(hashes))
+        for h in hashes:
+            self.filas[h] = len(self.filas)
+
+    def codificar(self, textos, codificar):
+        """Embeddings de `textos`; `codificar(lista)` solo se llama con los que faltan.
+
+        Los textos repetidos dentro de la misma llamada se codifican una vez.
+        """
+        hashes = [hashlib.sha256(texto.encode("utf-8")).digest() for texto in textos]
+        faltantes = {}
+        for texto, h in zip(textos, hashes):
+            if h not in self.filas and h not in faltantes:
+                faltantes[h] = texto
+        if faltantes:
+            self._agregar(list(faltantes), codificar(list(faltantes.values())))
+        self.codificados += len(faltantes)
+        self.aciertos += len(textos) - len(faltantes)
+        if not textos:
+            return np.zeros((0, self.dimension or 0), dtype=np.float32)
+        return np.asarray(self._leer([self.filas[h] for h in hashes]))
+
+    def resumen(self):
+        total = self.aciertos + self.codificados
+        tasa = self.aciertos / total if total else 0
+        return (f"♻️ Caché de embeddings: {self.aciertos} reutilizados, {self.codificados} "
+                f"codificados ({tasa:.0%} aciertos, {len(self)} vectores guardados)")
@@ -0,0 +1,105 @@
+"""Extracción de texto de PDFs por páginas, compartida por los pasos 01 y 03.
+
+Los PDFs grandes se dividen en unos RANGOS_POR_PROCESO rangos de páginas
+consecutivas por proceso (al menos PAGINAS_POR_RANGO páginas cada uno) que
+se extraen en un pool de procesos; cada proceso abre el archivo por su
+cuenta y devuelve la lista de textos de su rango. Los rangos son grandes
+porque abrir el PDF en cada tarea tiene un costo fijo. Los PDFs cortos se
+extraen en el proceso actual porque arrancar el pool cuesta más que lo que
+se ahorra.
+
+Se puede usar pdfplumber (01) o PyPDF2 (03); la librería se importa solo
+cuando se usa, así que cada script sigue necesitando solo la suya.
+"""
+import os
+import time
+import hashlib
+import tempfile
+from multiprocessing import Pool
+
+PAGINAS_POR_RANGO = 16
+RANGOS_POR_PROCESO = 4
+# Con menos páginas que esto no se arranca el pool de procesos
+MINIMO_PARALELO = 48
+
+MOTORES = ("pdfplumber", "pypdf2")
+
+
+def _abrir(ruta, motor):
+    if motor == "pdfplumber":
+        import pdfplumber
+        return pdfplumber.open(ruta)
+    if motor == "pypdf2":
+        import PyPDF2
+        return PyPDF2.PdfReader(ruta)
+    raise ValueError(f"Motor de PDF desconocido: {motor!r}. Opciones: {', '.join(MOTORES)}")
+
+
+def contar_paginas(ruta, motor="pdfplumber"):
+    documento = _abrir(ruta, motor)
+    try:
+        return len(documento.pages)
+    finally:
+        if motor == "pdfplumber":
+            documento.close()
+
+
+def _extraer_rango(tarea):
+    """Textos de las páginas [inicio, fin) ("" si una página no tiene texto)"""
+    ruta, motor, inicio, fin = tarea
+    documento = _abrir(ruta, motor)
+    textos = []
+    try:
+        for numero in range(inicio, fin):
+            pagina = documento.pages[numero]
+            textos.append(pagina.extract_text() or "")
+            if motor == "pdfplumber":
+                pagina.close()  # Libera los objetos de la página ya extraída
+    finally:
+        if motor == "pdfplumber":
+            documento.close()
+    return textos
+
+
+def extraer_paginas(ruta, motor="pdfplumber", workers=None):
+    """Devuelve la lista con el texto de cada página del PDF en `ruta`.
+
+    `workers` es la cantidad de procesos (por defecto, uno por núcleo). Desde
+    un hilo que no es el principal hay que pasar workers=1: crear un pool de
+    procesos en un programa con varios hilos puede trabarse. Al terminar se
+    informa la velocidad en páginas por segundo.
+    """
+    inicio = time.perf_counter()
+    total = contar_paginas(ruta, motor)
+    workers = workers or os.cpu_count() or 1
+    tamano = max(PAGINAS_POR_RANGO, -(-total // (workers * RANGOS_POR_PROCESO)))
+    tareas = [(ruta, motor, desde, min(desde + tamano, total))
+              for desde in range(0, total, tamano)]
+    paginas = []
+    if workers > 1 and total >= MINIMO_PARALELO:
+        with Pool(min(workers, len(tareas))) as pool:
+            for textos in pool.imap(_extraer_rango, tareas):
+                paginas.extend(textos)
+    else:
+        workers = 1
+        for tarea in tareas:
+            paginas.extend(_extraer_rango(tarea))
+    segundos = time.perf_counter() - inicio
+    print(f"   📄 {total} páginas en {segundos:.2f} s "
+          f"({total / max(segundos, 1e-9):.1f} páginas/s, {workers} proceso(s))")
+    return paginas
+
+
+def descargar_a_temporal(respuesta, carpeta=None):
+    """Escribe el cuerpo de una respuesta con stream=True en un .pdf temporal.
+
+    El SHA-256 se calcula mientras se escribe, sin volver a leer el archivo.
+    Devuelve (ruta, hash); quien llama debe borrar el archivo.
+    """
+    h = hashlib.sha256()
+    with respuesta, tempfile.NamedTemporaryFile("wb", suffix=".pdf", dir=carpeta,
+                                                delete=False) as f:
+        for bloque in respuesta.iter_content(chunk_size=1 << 16):
+            f.write(bloque)
+            h.update(bloque)
+    return f.name, h.hexdigest()
@@ -0,0 +1,54 @@
+"""Carga del modelo de embeddings con el backend elegido, compartida por 03, 04 y 05.
+
+- "torch":     el modelo de SentenceTransformer en PyTorch (float32)
+- "onnx-int8": el mismo modelo exportado a ONNX con cuantización dinámica
+               int8, ejecutado con ONNX Runtime en CPU
+
+La exportación se hace una sola vez y queda en CARPETA_MODELOS; las
+siguientes cargas leen el .onnx ya cuantizado. Los vectores del índice y
+de las consultas deben salir del mismo backend: 03 lo elige con `--backend`
+(por defecto, la variable de entorno RAG_BACKEND_EMBEDDINGS) y lo anota en
+corpus_embeddings/modelo.json, 04 lo lee de ahí y lo copia al config.json
+del índice, y 05 lo toma de ese config.json.
+
+Requiere `pip install "sentence-transformers[onnx]"` para "onnx-int8".
+"""
+import os
+import platform
+
+from sentence_transformers import SentenceTransformer
+
+BACKENDS = ("torch", "onnx-int8")
+BACKEND_EMBEDDINGS = os.environ.get("RAG_BACKEND_EMBEDDINGS", "torch")
+CARPETA_MODELOS = "modelos_onnx"
+
+
+def _configuracion_cuantizacion():
+    """Juego de instrucciones para el que se cuantiza (avx2 funciona en casi cualquier x86)"""
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        return "arm64"
+    return "avx2"
+
+
+def nombre_en_cache(model_name, backend=BACKEND_EMBEDDINGS):
+    """Clave de modelo para la caché de embeddings: cada backend da vectores distintos"""
+    return model_name if backend == "torch" else f"{model_name}@{backend}"
+
+
+def cargar_modelo(model_name, backend=BACKEND_EMBEDDINGS):
+    """Devuelve un SentenceTransformer con el backend pedido (ver BACKENDS)"""
+    if backend == "torch":
+        return SentenceTransformer(model_name)
+    if backend != "onnx-int8":
+        raise ValueError(f"Backend de embeddings desconocido: {backend!r}. "
+                         f"Opciones: {', '.join(BACKENDS)}")
+    configuracion = _configuracion_cuantizacion()
+    carpeta = os.path.join(CARPETA_MODELOS, model_name.replace("/", "__"))
+    archivo = f"onnx/model_qint8_{configuracion}.onnx"
+    if not os.path.exists(os.path.join(carpeta, archivo)):
+        from sentence_transformers import export_dynamic_quantized_onnx_model
+        print(f"📦 Exportando {model_name} a ONNX int8 ({configuracion}) en {carpeta}/...")
+        modelo = SentenceTransformer(model_name, backend="onnx")
+        modelo.save(carpeta)
+        export_dynamic_quantized_onnx_model(modelo, configuracion, carpeta)
+    return SentenceTransformer(carpeta, backend="onnx", model_kwargs={"file_name": archivo})
@@ -0,0 +1,191 @@
+"""Descargas concurrentes y respetuosas para 01_recolectar_corpus.py.
+
+Un pool de hilos comparte una sola `requests.Session`, así que las
+conexiones a un mismo servidor se reutilizan (keep-alive) en lugar de abrir
+una nueva por archivo. La pausa entre peticiones se aplica por host: dos
+servidores distintos se descargan en paralelo, pero a uno mismo no se le
+pide más de una página cada `intervalo` segundos. Los errores de red y las
+respuestas 429/5xx se reintentan con espera exponencial.
+
+Con una `CacheHTTP` las descargas repetidas son condicionales: se envían el
+ETag y el Last-Modified de la última vez y un 304 evita bajar el cuerpo.
+"""
+import os
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+# Respuestas que vale la pena reintentar
+ESTADOS_REINTENTABLES = {429, 500, 502, 503, 504}
+
+
+class LimitadorPorHost:
+    """Deja pasar como máximo una petición cada `intervalo` segundos por host"""
+
+    def __init__(self, intervalo=1.0):
+        self.intervalo = intervalo
+        self._proxima = {}  # host -> instante a partir del cual se puede pedir
+        self._lock = threading.Lock()
+
+    def esperar(self, url):
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            ahora = time.monotonic()
+            turno = max(ahora, self._proxima.get(host, ahora))
+            self._proxima[host] = turno + self.intervalo
+        # Se duerme fuera del lock: otros hosts no esperan a este
+        if turno > ahora:
+            time.sleep(turno - ahora)
+
+    def postergar(self, url, segundos):
+        """Aleja el próximo turno del host (p. ej. tras un 429 con Retry-After)"""
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            self._proxima[host] = max(self._proxima.get(host, 0), time.monotonic() + segundos)
+
+
+class CacheHTTP:
+    """ETag, Last-Modified y SHA-256 del contenido de cada URL descargada, en un JSON"""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._lock = threading.Lock()
+        self.entradas = {}
+        if os.path.exists(ruta):
+            with open(ruta, "r", encoding="utf-8") as f:
+                self.entradas = json.load(f)
+
+    def cabeceras(self, url):
+        """Cabeceras If-None-Match / If-Modified-Since para pedir `url` de nuevo"""
+        entrada = self.entradas.get(url, {})
+        cabeceras = {}
+        if entrada.get("etag"):
+            cabeceras["If-None-Match"] = entrada["etag"]
+        if entrada.get("last_modified"):
+            cabeceras["If-Modified-Since"] = entrada["last_modified"]
+        return cabeceras
+
+    def mismo_contenido(self, url, digest):
+        return self.entradas.get(url, {}).get("hash") == digest
+
+    def actualizar(self, url, respuesta, digest):
+        with self._lock:
+            self.entradas[url] = {
+                "etag": respuesta.headers.get("ETag"),
+                "last_modified": respuesta.headers.get("Last-Modified"),
+                "hash": digest,
+            }
+
+    def guardar(self):
+        """Escribe la caché de forma atómica (primero a un temporal)"""
+        with self._lock:
+            temporal = self.ruta + ".tmp"
+            with open(temporal, "w", encoding="utf-8") as f:
+                json.dump(self.entradas, f, ensure_ascii=False, indent=1)
+            os.replace(temporal, self.ruta)
+
+
+class Rastreador:
+    """Descarga URLs con `workers` hilos, una sesión compartida y reintentos"""
+
+    def __init__(self, workers=4, intervalo=1.0, reintentos=3, espera_base=1.0, timeout=15,
+                 cache=None):
+        self.workers = workers
+        self.cache = cache
+        self.reintentos = reintentos
+        self.espera_base = espera_base
+        self.timeout = timeout
+        self.limitador = LimitadorPorHost(intervalo)
+        self.sesion = requests.Session()
+        self.sesion.headers.update(HEADERS)
+        # Una conexión viva por hilo y host; los reintentos los maneja descargar()
+        adaptador = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=0)
+        self.sesion.mount("http://", adaptador)
+        self.sesion.mount("https://", adaptador)
+
+    def cerrar(self):
+        self.sesion.close()
+        if self.cache is not None:
+            self.cache.guardar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def descargar(self, url, condicional=False, **opciones):
+        """GET con límite por host y reintentos; devuelve la respuesta o lanza la última excepción.
+
+        Con `condicional=True` y una caché se pide solo si cambió: la respuesta
+        puede ser un 304 sin cuerpo. Con `stream=True` el cuerpo queda sin
+        leer y hay que cerrar la respuesta.
+        """
+        if condicional and self.cache is not None:
+            opciones["headers"] = {**self.cache.cabeceras(url), **opciones.get("headers", {})}
+        for intento in range(self.reintentos + 1):
+            self.limitador.esperar(url)
+            espera = self.espera_base * 2 ** intento
+            try:
+                respuesta = self.sesion.get(url, timeout=self.timeout, **opciones)
+            except (requests.ConnectionError, requests.Timeout):
+                if intento == self.reintentos:
+                    raise
+            else:
+                if respuesta.status_code not in ESTADOS_REINTENTABLES or intento == self.reintentos:
+                    respuesta.raise_for_status()
+                    return respuesta
+                espera = max(espera, _retry_after(respuesta))
+                respuesta.close()
+            print(f"🔁 Reintentando {url} en {espera:.1f} s ({intento + 1}/{self.reintentos})")
+            self.limitador.postergar(url, espera)
+
+    def rastrear(self, fuentes, procesar):
+        """Llama a `procesar(self, fuente)` para cada fuente en el pool de hilos.
+
+        Devuelve la lista de resultados en el orden de `fuentes`.
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(lambda fuente: procesar(self, fuente), fuentes))
+
+
+def _retry_after(respuesta):
+    """Segundos pedidos por el servidor en Retry-After (0 si no hay o es una fecha)"""
+    try:
+        return float(respuesta.headers.get("Retry-After", 0))
+    except ValueError:
+        return 0
+
+
+def cargar_fuentes(ruta):
+    """Lee una lista de fuentes: una por línea como `url nombre [web|pdf]`.
+
+    Las líneas vacías y las que empiezan con # se ignoran. Si falta el tipo,
+    se usa "pdf" para URLs que terminan en .pdf y "web" para el resto.
+    """
+    fuentes = []
+    with open(ruta, "r", encoding="utf-8") as f:
+        for numero, linea in enumerate(f, 1):
+            partes = linea.split()
+            if not partes or partes[0].startswith("#"):
+                continue
+            if len(partes) not in (2, 3):
+                raise ValueError(f"{ruta}:{numero}: se esperaba 'url nombre [web|pdf]'")
+            url, nombre = partes[:2]
+            if len(partes) == 3:
+                tipo = partes[2]
+            else:
+                tipo = "pdf" if urlsplit(url).path.lower().endswith(".pdf") else "web"
+            if tipo not in ("web", "pdf"):
+                raise ValueError(f"{ruta}:{numero}: tipo desconocido {tipo!r}")
+            fuentes.append({"url": url, "nombre": nombre, "tipo": tipo})
+    return fuentes
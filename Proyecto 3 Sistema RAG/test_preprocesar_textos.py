@@ -0,0 +1,77 @@
+"""Compara fragmentar_lineas de 02_preprocesar_textos.py con el pipeline original.
+
+    python -m pytest test_preprocesar_textos.py
+"""
+import io
+import os
+import re
+import random
+import importlib.util
+
+_RUTA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "02_preprocesar_textos.py")
+_spec = importlib.util.spec_from_file_location("preprocesar_textos", _RUTA)
+preprocesar = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(preprocesar)
+
+
+# limpiar_texto y dividir_en_fragmentos tal como estaban antes del streaming
+def limpiar_texto_original(texto):
+    texto = re.sub(r'\n\s*\n', '\n\n', texto)
+    texto = re.sub(r'[ \t]+', ' ', texto)
+    texto = re.sub(r'https?://\S+|www\.\S+', '', texto)
+    texto = re.sub(r'\S+@\S+', '', texto)
+    texto = re.sub(r'[^\w\s.,;:¡!¿?áéíóúüñÁÉÍÓÚÜÑ\-]', '', texto)
+    return texto.strip()
+
+
+def dividir_en_fragmentos_original(texto, palabras_por_fragmento=500):
+    palabras = texto.split()
+    if len(palabras) <= palabras_por_fragmento:
+        return [texto]
+    return [' '.join(palabras[i:i + palabras_por_fragmento])
+            for i in range(0, len(palabras), palabras_por_fragmento)]
+
+
+def fragmentos_originales(texto, palabras_por_fragmento):
+    """Lo que guardaba 02 antes: se descartaban los fragmentos vacíos"""
+    texto = io.StringIO(texto, newline=None).read()  # f.read() con saltos universales
+    limpio = limpiar_texto_original(texto)
+    return [f for f in dividir_en_fragmentos_original(limpio, palabras_por_fragmento) if f.strip()]
+
+
+def fragmentos_streaming(texto, palabras_por_fragmento):
+    # Igual que al leer el archivo en 02: línea por línea, con saltos universales
+    lineas = io.StringIO(texto, newline=None)
+    return list(preprocesar.fragmentar_lineas(lineas, palabras_por_fragmento))
+
+
+PIEZAS = ["hola", "árbol", "niño", "a", "b", "#", "@", "a@b.c", "x#@y", "€", "¿qué?",
+          "http://x.y/z", "https://a.b", "www.ejemplo.com", "fin.", "-", "_", "123",
+          " ", "  ", "\t", " \t ", "\n", "\n\n", "\n \n", " \n\t\n ", "\r\n", "\xa0", " "]
+
+
+def texto_al_azar(azar):
+    return "".join(azar.choice(PIEZAS) for _ in range(azar.randint(0, 60)))
+
+
+def test_coincide_con_pipeline_original():
+    azar = random.Random(0)
+    for _ in range(5000):
+        texto = texto_al_azar(azar)
+        palabras = azar.choice([1, 2, 3, 5, 8, 400])
+        assert fragmentos_streaming(texto, palabras) == fragmentos_originales(texto, palabras), \
+            (texto, palabras)
+
+
+def test_limpiar_texto_igual_al_original():
+    azar = random.Random(1)
+    for _ in range(5000):
+        texto = texto_al_azar(azar).replace("\r", "")
+        assert preprocesar.limpiar_texto(texto) == limpiar_texto_original(texto), texto
+
+
+def test_casos_de_espacios():
+    # Lo eliminado entre espacios deja espacios dobles, como antes
+    for texto in ["a \t # \t b", "uno\n # \ndos", "  x@y  z  ", "p\n\n\n q", ""]:
+        for palabras in (1, 2, 400):
+            assert fragmentos_streaming(texto, palabras) == fragmentos_originales(texto, palabras)